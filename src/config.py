@@ -10,13 +10,14 @@ load_dotenv()
 
 class BrowserConfig(BaseModel):
     """Browser-specific configuration."""
-    headless: bool = Field(default=False)
+    headless: bool = Field(default=True)
     slow_mo: int = Field(default=25, ge=0)
     viewport_width: int = Field(default=1920, ge=800)
     viewport_height: int = Field(default=1080, ge=600)
     default_timeout: int = Field(default=5000, ge=1000)
     download_timeout: int = Field(default=30000, ge=5000)
     user_agent: str = Field(default="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36")
+    block_assets: bool = Field(default=False)
 
 class RetryConfig(BaseModel):
     """Retry mechanism configuration."""
@@ -52,6 +53,7 @@ class EBoekhoudenConfig(BaseModel):
     password: str = Field(default=...)
     base_url: str = Field(default="https://secure20.e-boekhouden.nl")
     login_url: str = Field(default="https://secure.e-boekhouden.nl/bh/?ts=340591811462&c=homepage&SV=A")
+    session_ttl_hours: int = Field(default=8, ge=0)
     table_columns: dict = Field(default={
         'date': 'td:nth-child(4)',
         'employee': 'td:nth-child(5)', 
@@ -67,6 +69,7 @@ class DirectoryConfig(BaseModel):
     output_dir: Path = Field(default=Path("output"))
     temp_dir: Path = Field(default=Path("temp"))
     screenshots_dir: Path = Field(default=Path("temp/screenshots"))
+    session_path: Path = Field(default=Path(".eboekhouden_state.json"))
 
 class DevelopmentConfig(BaseModel):
     """Development configuration."""
@@ -102,13 +105,14 @@ def load_config() -> AppConfig:
 
     # Browser configuration
     browser_config = BrowserConfig(
-        headless=os.getenv("BROWSER_HEADLESS", "").lower() == "true",
+        headless=os.getenv("BROWSER_HEADLESS", "true").lower() == "true",
         slow_mo=int(os.getenv("BROWSER_SLOW_MO", "25")),
         viewport_width=int(os.getenv("BROWSER_VIEWPORT_WIDTH", "1920")),
         viewport_height=int(os.getenv("BROWSER_VIEWPORT_HEIGHT", "1080")),
         default_timeout=int(os.getenv("BROWSER_DEFAULT_TIMEOUT", "5000")),
         download_timeout=int(os.getenv("BROWSER_DOWNLOAD_TIMEOUT", "30000")),
-        user_agent=os.getenv("BROWSER_USER_AGENT", "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36")
+        user_agent=os.getenv("BROWSER_USER_AGENT", "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36"),
+        block_assets=os.getenv("BROWSER_BLOCK_ASSETS", "false").lower() == "true"
     )
 
     # Retry configuration
@@ -123,7 +127,8 @@ def load_config() -> AppConfig:
         username=os.getenv("EBOEKHOUDEN_USERNAME", ""),
         password=os.getenv("EBOEKHOUDEN_PASSWORD", ""),
         base_url=os.getenv("EBOEKHOUDEN_BASE_URL", "https://secure20.e-boekhouden.nl"),
-        login_url=os.getenv("EBOEKHOUDEN_LOGIN_URL", "https://secure.e-boekhouden.nl/bh/?ts=340591811462&c=homepage&SV=A")
+        login_url=os.getenv("EBOEKHOUDEN_LOGIN_URL", "https://secure.e-boekhouden.nl/bh/?ts=340591811462&c=homepage&SV=A"),
+        session_ttl_hours=int(os.getenv("EBOEKHOUDEN_SESSION_TTL_HOURS", "8"))
     )
 
     # Logging configuration
@@ -2,6 +2,7 @@ from typing import Optional, Dict, Any
 from pathlib import Path
 import logging
 import json
+import time
 from datetime import datetime
 
 from src.eboekhouden import EBoekhoudenClient
@@ -168,9 +169,10 @@ class Container:
             # Step 4: Add events if not in dry run mode
             if not dry_run and events_to_add:
                 self.logger.info(f"Adding {len(events_to_add)} events to e-boekhouden...")
+                created_at = time.strftime("%Y-%m-%d %H:%M:%S")
                 for event in events_to_add:
                     self.logger.info(f"Attempting to add event {event['event_id']}...")
-                    if client.add_hours_direct(event):
+                    if client.add_hours_direct(event, created_at):
                         self.logger.info(f"Successfully added event {event['event_id']}")
                         stats["added"] += 1
                     else:
@@ -1,13 +1,76 @@
-from playwright.sync_api import Page, Frame, sync_playwright, TimeoutError, ElementHandle
+from __future__ import annotations
+
+import asyncio
 import logging
-from typing import Optional, Dict, Any
+import types
+from typing import Optional, Dict, Any, List, TYPE_CHECKING
 import os
-from datetime import datetime
-import pytz
-import json
+from datetime import datetime, timezone
+
+import orjson
+import pandas as pd
+from playwright.sync_api import Frame, ElementHandle, sync_playwright, expect, TimeoutError as PlaywrightTimeoutError
+
 from src.logging_config import get_logger, log_dict
 from src.config import config
 
+if TYPE_CHECKING:
+    from playwright.async_api import BrowserContext as AsyncBrowserContext
+
+# Chromium flags that cut per-page CPU and memory overhead when no real window is needed
+CHROMIUM_ARGS = [
+    '--disable-extensions',
+    '--disable-plugins',
+    '--disable-dev-shm-usage',
+    '--disable-background-networking',
+    '--disable-sync',
+    '--disable-default-apps',
+    '--disable-renderer-backgrounding',
+    '--no-zygote',
+    '--disable-gpu',
+]
+
+# Maximum number of browser contexts rendering year overviews at the same time
+MAX_PARALLEL_CONTEXTS = 4
+
+# Text column types of the hours export, applied once after the header rows are trimmed
+XLS_COLUMN_DTYPES = {
+    "Medewerker": "string",
+    "Project": "string",
+    "Activiteit": "string",
+    "Omschrijving": "string",
+}
+
+# Part of the URL the hours form posts a new registration to
+SAVE_ENTRY_URL_PART = 'urenregistratie'
+
+# Extracts every table row in a single round-trip; shared by the sync and async code paths
+EXTRACT_ROWS_JS = """(rows, selectors) => rows.map(row => {
+    const registration = {};
+    for (const [field, selector] of Object.entries(selectors)) {
+        const cell = row.querySelector(selector);
+        registration[field] = cell ? cell.textContent.trim() : '';
+    }
+    return registration;
+})"""
+
+# Fills the plain (non-autocomplete) add-hours form fields in a single round-trip.
+# Values are set through the native setter and followed by input/change/blur events
+# so Angular picks them up the same way it does for typed input.
+FILL_HOURS_FORM_JS = """({date, hours, comments}) => {
+    const set = (selector, value) => {
+        const el = document.querySelector(selector);
+        const proto = el instanceof HTMLTextAreaElement ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+        Object.getOwnPropertyDescriptor(proto, 'value').set.call(el, value);
+        for (const type of ['input', 'change', 'blur']) {
+            el.dispatchEvent(new Event(type, {bubbles: true}));
+        }
+    };
+    set('input#datum', date);
+    set('input#aantalUren', hours);
+    set('textarea#opmerkingen', comments);
+}"""
+
 class EBoekhoudenClient:
     def __init__(self):
         """Initialize the client."""
@@ -27,30 +90,84 @@ class EBoekhoudenClient:
         self._browser = self._playwright.chromium.launch(
             headless=config.browser.headless,
             slow_mo=config.browser.slow_mo,
-            args=['--disable-extensions', '--disable-plugins']
+            args=CHROMIUM_ARGS,
+            ignore_default_args=['--enable-automation'],
+            chromium_sandbox=False
         )
         
+        # Reuse a recent session from a previous run to skip the login round-trips
+        storage_state = self._load_session_state()
+        self._session_restored = storage_state is not None
+        
         self._context = self._browser.new_context(
             user_agent=config.browser.user_agent,
             viewport={'width': config.browser.viewport_width, 'height': config.browser.viewport_height},
             ignore_https_errors=True,
             java_script_enabled=True,
             bypass_csp=True,
-            storage_state=None,
+            storage_state=storage_state,
             accept_downloads=True,
             strict_selectors=True,
             service_workers='block'
         )
         
-        # Clear cookies only during initialization
-        self._context.clear_cookies()
+        # Clear cookies only during initialization, unless a session was restored
+        if not self._session_restored:
+            self._context.clear_cookies()
         self._page = self._context.new_page()
         self._page.set_default_timeout(config.browser.default_timeout)
         
+        # Locators are lazy bindings, so they can be built once and reused across navigations
+        self._loc = types.SimpleNamespace(
+            year_radio=self._page.locator('input[type="radio"][value="jaar"]'),
+            verder=self._page.locator('button.button.form-submit:has(span:text("Verder"))'),
+            add_button=self._page.locator('app-target-link a:has(app-icon[name="plus"]) >> text=Toevoegen').first,
+            save=self._page.locator('button.button.form-submit:has-text("Opslaan")'),
+            rows=self._page.locator('app-grid table.table-v1 tbody tr')
+        )
+        
         self.browser_logger.info("Browser initialized with custom configuration")
     
-    def _take_screenshot(self, name: str):
-        """Take a screenshot and save it in the temp/screenshots directory."""
+    def _load_session_state(self) -> Optional[str]:
+        """Return the path of the saved session state if it exists and is still fresh."""
+        session_path = config.directories.session_path
+        if not os.path.exists(session_path):
+            return None
+        
+        age_seconds = datetime.now().timestamp() - os.path.getmtime(session_path)
+        if age_seconds > config.eboekhouden.session_ttl_hours * 3600:
+            self.browser_logger.info("Saved session state expired, a fresh login is required")
+            return None
+        
+        self.browser_logger.info(f"Restoring session state from {session_path}")
+        return str(session_path)
+    
+    def _save_session_state(self):
+        """Persist the context's cookies and storage so later runs can skip the login."""
+        try:
+            self._context.storage_state(path=str(config.directories.session_path))
+        except Exception as e:
+            self.browser_logger.warning(f"Could not save session state: {str(e)}")
+    
+    def _is_logged_in(self) -> bool:
+        """Check whether the restored session still gives access to the hours overview."""
+        try:
+            self._page.goto(f"{config.eboekhouden.base_url}/uren/overzicht", wait_until='domcontentloaded')
+            if "inloggen" in self._page.url or any("inloggen.asp" in frame.url for frame in self._page.frames):
+                return False
+            self._page.wait_for_selector('app-grid', state='attached', timeout=config.browser.default_timeout)
+            return True
+        except Exception:
+            return False
+    
+    def _take_screenshot(self, name: str, force: bool = False):
+        """Take a screenshot and save it in the temp/screenshots directory.
+        
+        Screenshots are only taken when debug logging is enabled, unless force is set.
+        Force is reserved for the top-level error handlers of the public methods.
+        """
+        if not force and not self.browser_logger.isEnabledFor(logging.DEBUG):
+            return
         screenshot_path = os.path.join(config.directories.screenshots_dir, f"{name}.png")
         self._page.screenshot(path=screenshot_path)
     
@@ -58,6 +175,14 @@ class EBoekhoudenClient:
         """Log into e-boekhouden.nl using provided credentials."""
         self.business_logger.info("Starting login process...")
         
+        if self._session_restored:
+            # Only trust the restored session once, fall back to a full login when it is stale
+            self._session_restored = False
+            if self._is_logged_in():
+                self.business_logger.info("Restored session is still logged in, skipping login")
+                return True
+            self.business_logger.info("Restored session is no longer valid, logging in again")
+        
         try:
             self._page.goto(config.eboekhouden.login_url, wait_until='domcontentloaded')
             self.network_logger.info(f"Navigated to {config.eboekhouden.login_url}")
@@ -73,13 +198,13 @@ class EBoekhoudenClient:
             
             return self._perform_login(login_frame, username, password)
             
-        except TimeoutError as e:
+        except PlaywrightTimeoutError as e:
             self.network_logger.error(f"Timeout error during login: {str(e)}")
-            self._take_screenshot("timeout_error")
+            self._take_screenshot("timeout_error", force=True)
             return False
         except Exception as e:
             self.business_logger.error(f"Unexpected error during login: {str(e)}")
-            self._take_screenshot("unexpected_error")
+            self._take_screenshot("unexpected_error", force=True)
             return False
     
     def _find_login_frame(self) -> Optional[Frame]:
@@ -94,7 +219,7 @@ class EBoekhoudenClient:
                     return frame
             attempt += 1
             if attempt < max_attempts:
-                self.browser_logger.info(f"Login frame not found, attempt {attempt}/{max_attempts}")
+                self.browser_logger.debug("Login frame not found, attempt %d/%d", attempt, max_attempts)
                 self._page.wait_for_timeout(config.retry.delay_ms)
         
         self.browser_logger.error(f"Login frame not found after {max_attempts} attempts")
@@ -134,22 +259,20 @@ class EBoekhoudenClient:
             self.browser_logger.info("Attempting login...")
             login_button.click()
             
-            # Wait for the page to load after login
-            self._page.wait_for_load_state('networkidle', timeout=10000)
-            
             # Wait for the frames to appear, indicating successful login
             self._page.wait_for_selector("frame[name='menuframe']", state='attached', timeout=8000)
             self._page.wait_for_selector("frame[name='mainframe']", state='attached', timeout=8000)
             
             # Save the page content after login
             self._save_page_content("after_login")
+            self._save_session_state()
             
             self.browser_logger.info("Login successful!")
             return True
             
         except Exception as e:
             self.browser_logger.error(f"Login failed: {str(e)}")
-            self._take_screenshot("login_error")
+            self._take_screenshot("login_error", force=True)
             return False
     
     def close(self):
@@ -169,68 +292,22 @@ class EBoekhoudenClient:
     def fetch_hours(self, year: int) -> dict:
         """Fetch hour registrations for a given year."""
         try:
-            # Navigate to hours overview
-            if not self._navigate_to_hours_overview():
-                return {}
-            
-            # Find and click year radio button with retry
-            year_radio = self._wait_for_selector('input[type="radio"][value="jaar"]', 
-                                             state='visible',
-                                             timeout=config.retry.delay_ms)
-            
-            if not year_radio:
-                self.browser_logger.error("Year radio button not found after max attempts")
-                self._save_page_content("year_radio_not_found")
-                self._page.screenshot(path="error_year_radio_not_found.png")
+            if not self._navigate_and_select_year(year):
                 return {}
             
-            # Find and select the year from dropdown with retry
-            self.browser_logger.info(f"Selecting year {year}")
-            attempt = 0
-            year_select = None
-            
-            while attempt < config.retry.max_attempts and not year_select:
-                try:
-                    # Try to find enabled dropdown
-                    year_select = self._page.wait_for_selector('select.form-select.rect#input-year:not([disabled])', 
-                                                           state='visible',
-                                                           timeout=config.retry.delay_ms)
-                    if year_select:
-                        self.browser_logger.info(f"Found enabled year dropdown on attempt {attempt + 1}")
-                        break
-                except TimeoutError:
-                    pass
-                
-                attempt += 1
-                if attempt < config.retry.max_attempts:
-                    self.browser_logger.info(f"Year dropdown not found or not enabled, attempt {attempt}/{config.retry.max_attempts}")
-                    self._page.wait_for_timeout(config.retry.delay_ms)
-
             # Extract data from table using configured selectors
-            rows = self._page.locator('app-grid table.table-v1 tbody tr')
+            rows = self._loc.rows
             
             # Wait a bit for all rows to load
             self._page.wait_for_timeout(config.browser.default_timeout)
             
-            count = rows.count()
-            if count == 0:
+            # Extract all rows using configured column selectors
+            registrations = rows.evaluate_all(EXTRACT_ROWS_JS, config.eboekhouden.table_columns)
+            if not registrations:
                 self.browser_logger.error("No rows found in table")
                 return {}
-                
-            registrations = []
-            
-            # Use configured column selectors
-            cell_selectors = config.eboekhouden.table_columns
-            
-            # Batch process rows
-            for i in range(count):
-                row = rows.nth(i)
-                registration = {
-                    field: row.locator(selector).text_content().strip()
-                    for field, selector in cell_selectors.items()
-                }
-                registrations.append(registration)
-                
+            
+            for registration in registrations:
                 # Only log if debug logging is enabled
                 self.browser_logger.info(f"Date: {registration['date']}, Employee: {registration['employee']}, "
                              f"Project: {registration['project']}, Activity: {registration['activity']}, "
@@ -243,7 +320,79 @@ class EBoekhoudenClient:
         except Exception as e:
             self.browser_logger.error(f"Failed to fetch hours: {str(e)}")
             self._save_page_content("error_state")
-            self._page.screenshot(path="error_fetch_hours.png")
+            self._take_screenshot("error_fetch_hours", force=True)
+            return {}
+
+    async def fetch_hours_many(self, years: List[int], storage_state: Optional[Dict[str, Any]] = None) -> Dict[int, dict]:
+        """Fetch hour registrations for several years in parallel browser contexts.
+        
+        A single browser is launched and every year gets its own context, with at most
+        MAX_PARALLEL_CONTEXTS contexts active at the same time.
+        
+        Args:
+            years: The years to fetch hours for
+            storage_state: Session state of a logged-in context, as returned by
+                           ``self._context.storage_state()``. Must be captured before
+                           entering the event loop, as the sync API cannot be used inside it.
+                           
+        Returns:
+            Dictionary mapping each year to the result of fetching that year, in the
+            same format as fetch_hours
+        """
+        from playwright.async_api import async_playwright
+        
+        semaphore = asyncio.Semaphore(MAX_PARALLEL_CONTEXTS)
+        
+        async with async_playwright() as playwright:
+            browser = await playwright.chromium.launch(
+                headless=config.browser.headless,
+                slow_mo=config.browser.slow_mo,
+                args=CHROMIUM_ARGS,
+                ignore_default_args=['--enable-automation'],
+                chromium_sandbox=False
+            )
+            
+            async def fetch_one(year: int) -> dict:
+                async with semaphore:
+                    context = await browser.new_context(
+                        user_agent=config.browser.user_agent,
+                        viewport={'width': config.browser.viewport_width, 'height': config.browser.viewport_height},
+                        ignore_https_errors=True,
+                        storage_state=storage_state,
+                        service_workers='block'
+                    )
+                    try:
+                        return await self._fetch_one(context, year)
+                    finally:
+                        await context.close()
+            
+            try:
+                results = await asyncio.gather(*[fetch_one(year) for year in years])
+            finally:
+                await browser.close()
+        
+        return dict(zip(years, results))
+
+    async def _fetch_one(self, context: AsyncBrowserContext, year: int) -> dict:
+        """Fetch hour registrations for a single year in the given async browser context."""
+        try:
+            page = await context.new_page()
+            page.set_default_timeout(config.browser.default_timeout)
+            await page.goto(f"{config.eboekhouden.base_url}/uren/overzicht", wait_until='domcontentloaded')
+            
+            await page.locator('input[type="radio"][value="jaar"]').click()
+            await page.locator('select.form-select.rect#input-year:not([disabled])').select_option(label=str(year))
+            await page.locator('button.button.form-submit span:has-text("Verder")').click()
+            
+            rows = page.locator('app-grid table.table-v1 tbody tr')
+            await page.locator('app-grid table.table-v1').wait_for(state='visible')
+            registrations = await rows.evaluate_all(EXTRACT_ROWS_JS, config.eboekhouden.table_columns)
+            
+            self.browser_logger.info(f"Found {len(registrations)} hour registrations for {year}")
+            return {'year': year, 'data': registrations}
+            
+        except Exception as e:
+            self.browser_logger.error(f"Failed to fetch hours for {year}: {str(e)}")
             return {}
 
     def _handle_autocomplete(self, input_id: str, value: str, timeout: int = 10000):
@@ -260,7 +409,7 @@ class EBoekhoudenClient:
         input_element.fill('')  # Clear first
         input_element.fill(value)
         
-        # Wait a bit for the dropdown to appear
+        # Wait a bit for the dropdown to appear, its item markup is not documented so there is nothing reliable to wait on
         self._page.wait_for_timeout(1000)
         
         # Press Enter to select the first matching item
@@ -269,6 +418,36 @@ class EBoekhoudenClient:
         # Wait a bit for the selection to be processed
         self._page.wait_for_timeout(500)
 
+    def _save_entry(self, timeout: int = 15000) -> bool:
+        """Click "Opslaan" and wait until the server has answered the save request.
+        
+        The overview is a single page app, so no page load marks the end of the save.
+        Only the POST to the registration endpoint counts, other requests such as
+        analytics or session keep-alives do not mean the entry was saved.
+        
+        Returns:
+            bool: True if the save request succeeded, False otherwise
+        """
+        try:
+            with self._page.expect_response(
+                lambda response: SAVE_ENTRY_URL_PART in response.url and response.request.method == "POST",
+                timeout=timeout
+            ) as response_info:
+                self._loc.save.click()
+        except PlaywrightTimeoutError:
+            self.browser_logger.error("No response to the save request within %d ms", timeout)
+            return False
+        
+        response = response_info.value
+        if not response.ok:
+            self.browser_logger.error("Saving the entry failed: %s %s", response.status, response.url)
+            return False
+        return True
+
+    def _fill_hours_form(self, date: str, hours: str, comments: str):
+        """Fill the date, hours and comments fields of the add hours form in one evaluate call."""
+        self._page.evaluate(FILL_HOURS_FORM_JS, {"date": date, "hours": hours, "comments": comments})
+
     def add_hours(self) -> bool:
         """Navigate to the add hours page and fill in the hour registration."""
         self.browser_logger.info("Navigating to add hours page")
@@ -276,30 +455,23 @@ class EBoekhoudenClient:
         try:
             # First navigate to the hours overview page
             self._page.goto("https://secure20.e-boekhouden.nl/uren/overzicht")
-            self._page.wait_for_load_state('networkidle')
+            self._page.wait_for_selector('app-target-link a:has(app-icon[name="plus"])', state='visible')
             
             # Look for the "Toevoegen" button with the specific structure
-            add_button = self._page.locator('app-target-link a:has(app-icon[name="plus"]) >> text=Toevoegen').first
+            add_button = self._loc.add_button
             
             if not add_button:
                 self.browser_logger.error("Add button not found")
                 self._save_page_content("add_button_not_found")
-                self._page.screenshot(path=os.path.join("temp", "screenshots", "add_button_not_found.png"))
+                self._take_screenshot("add_button_not_found")
                 return False
             
             self.browser_logger.info("Found add button, clicking...")
             add_button.click()
             
-            # Wait for navigation to complete and form to be visible
-            self._page.wait_for_load_state('networkidle')
+            # Wait for the form to be visible
             self._page.wait_for_selector('form', state='visible')
             
-            # Fill in the date (2023-01-01)
-            self.browser_logger.info("Filling in date...")
-            date_input = self._page.locator('input#datum')
-            date_input.fill('01-01-2023')
-            date_input.press('Tab')  # To ensure date is accepted
-            
             # Handle all autocomplete fields
             self.browser_logger.info("Selecting employee...")
             self._handle_autocomplete('medewerkerId', 'Dave Bieleveld')
@@ -310,24 +482,16 @@ class EBoekhoudenClient:
             self.browser_logger.info("Selecting activity...")
             self._handle_autocomplete('activiteitId', 'Intern - Ontwikkelen')
             
-            # Fill in hours (8)
-            self.browser_logger.info("Filling in hours...")
-            hours_input = self._page.locator('input#aantalUren')
-            hours_input.fill('8')
-            
-            # Fill in comments with current timestamp
-            self.browser_logger.info("Adding timestamp comment...")
-            comments_input = self._page.locator('textarea#opmerkingen')
+            # Fill in date (2023-01-01), hours (8) and comments with current timestamp
+            self.browser_logger.info("Filling in date, hours and timestamp comment...")
             timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            comments_input.fill(f"Test entry - Created at: {timestamp}")
+            self._fill_hours_form('01-01-2023', '8', f"Test entry - Created at: {timestamp}")
             
             # Click save button
             self.browser_logger.info("Saving entry...")
-            save_button = self._page.locator('button.button.form-submit:has-text("Opslaan")')
-            save_button.click()
-            
-            # Wait for save to complete
-            self._page.wait_for_load_state('networkidle')
+            if not self._save_entry():
+                self._save_page_content("error_save")
+                return False
             self._save_page_content("after_save")
             
             return True
@@ -335,7 +499,7 @@ class EBoekhoudenClient:
         except Exception as e:
             self.browser_logger.error(f"Failed to add hours: {str(e)}")
             self._save_page_content("error_add_hours")
-            self._page.screenshot(path=os.path.join("temp", "screenshots", "error_add_hours.png"))
+            self._take_screenshot("error_add_hours", force=True)
             return False 
 
     def add_hours_direct(self, event: dict) -> bool:
@@ -362,7 +526,6 @@ class EBoekhoudenClient:
             
             # Navigate directly to the add hours page
             self._page.goto("https://secure20.e-boekhouden.nl/uren/overzicht/0")
-            self._page.wait_for_load_state('networkidle')
             
             # Wait for form to be visible
             self._page.wait_for_selector('form', state='visible')
@@ -382,12 +545,6 @@ class EBoekhoudenClient:
             # Format description with subject and event_id
             description = f"{event['subject']}\n[event_id:{event['event_id']}]"
             
-            # Fill in the date
-            self.browser_logger.info(f"Filling in date: {date_str}")
-            date_input = self._page.locator('input#datum')
-            date_input.fill(date_str)
-            date_input.press('Tab')  # To ensure date is accepted
-            
             # Handle all autocomplete fields
             self.browser_logger.info("Selecting employee...")
             self._handle_autocomplete('medewerkerId', 'Dave Bieleveld')
@@ -398,23 +555,15 @@ class EBoekhoudenClient:
             self.browser_logger.info(f"Selecting activity: {activity}")
             self._handle_autocomplete('activiteitId', activity)
             
-            # Fill in hours
-            self.browser_logger.info(f"Filling in hours: {hours}")
-            hours_input = self._page.locator('input#aantalUren')
-            hours_input.fill(str(hours))
-            
-            # Fill in description with event_id for tracking
-            self.browser_logger.info("Adding description with event_id...")
-            comments_input = self._page.locator('textarea#opmerkingen')
-            comments_input.fill(description)
+            # Fill in date, hours and description with event_id for tracking
+            self.browser_logger.info(f"Filling in date: {date_str}, hours: {hours} and description with event_id...")
+            self._fill_hours_form(date_str, str(hours), description)
             
             # Click save button
             self.browser_logger.info("Saving entry...")
-            save_button = self._page.locator('button.button.form-submit:has-text("Opslaan")')
-            save_button.click()
-            
-            # Wait for save to complete
-            self._page.wait_for_load_state('networkidle')
+            if not self._save_entry():
+                self._save_page_content("error_save_direct")
+                return False
             self._save_page_content("after_save_direct")
             
             return True
@@ -425,7 +574,7 @@ class EBoekhoudenClient:
         except Exception as e:
             self.browser_logger.error(f"Failed to add hours (direct): {str(e)}")
             self._save_page_content("error_add_hours_direct")
-            self._page.screenshot(path=os.path.join("temp", "screenshots", "error_add_hours_direct.png"))
+            self._take_screenshot("error_add_hours_direct", force=True)
             return False 
 
     def download_hours_xls(self, year: int) -> tuple[str, list[dict]]:
@@ -438,79 +587,7 @@ class EBoekhoudenClient:
             Tuple of (path to downloaded file, list of event dictionaries)
         """
         try:
-            # Navigate to hours overview
-            if not self._navigate_to_hours_overview():
-                return "", []
-            
-            # Find and click year radio button with retry
-            year_radio = self._wait_for_selector('input[type="radio"][value="jaar"]', 
-                                             state='visible',
-                                             timeout=config.retry.delay_ms)
-            
-            if not year_radio:
-                self.browser_logger.error("Year radio button not found after max attempts")
-                self._save_page_content("year_radio_not_found")
-                self._page.screenshot(path="error_year_radio_not_found.png")
-                return "", []
-            
-            # Find and select the year from dropdown with retry
-            self.browser_logger.info(f"Selecting year {year}")
-            attempt = 0
-            year_select = None
-            
-            while attempt < config.retry.max_attempts and not year_select:
-                try:
-                    # Try to find enabled dropdown
-                    year_select = self._page.wait_for_selector('select.form-select.rect#input-year:not([disabled])', 
-                                                           state='visible',
-                                                           timeout=config.retry.delay_ms)
-                    if year_select:
-                        self.browser_logger.info(f"Found enabled year dropdown on attempt {attempt + 1}")
-                        break
-                except TimeoutError:
-                    pass
-                
-                attempt += 1
-                if attempt < config.retry.max_attempts:
-                    self.browser_logger.info(f"Year dropdown not found or not enabled, attempt {attempt}/{config.retry.max_attempts}")
-                    self._page.wait_for_timeout(config.retry.delay_ms)
-                
-            if not year_select:
-                self.browser_logger.error("Year dropdown not found or not enabled after max attempts")
-                self._save_page_content("year_dropdown_not_found")
-                self._page.screenshot(path="error_year_dropdown_not_found.png")
-                return "", []
-            
-            # The value format is "index: year", so we need to find the right option
-            year_options = year_select.evaluate("""select => {
-                const options = select.options;
-                const values = [];
-                for (let i = 0; i < options.length; i++) {
-                    values.push({
-                        value: options[i].value,
-                        text: options[i].text.trim()
-                    });
-                }
-                return values;
-            }""")
-            
-            target_value = None
-            for option in year_options:
-                if str(year) == option['text'].strip():
-                    target_value = option['value']
-                    break
-            
-            if not target_value:
-                self.browser_logger.error(f"Year {year} not found in dropdown")
-                self._save_page_content("year_not_found")
-                self._page.screenshot(path="error_year_not_found.png")
-                return "", []
-            
-            self.browser_logger.info(f"Selecting year value: {target_value}")
-            year_select.select_option(target_value)
-            
-            # Click the "Verder" button to confirm selection
-            if not self._click_verder_button():
+            if not self._navigate_and_select_year(year):
                 return "", []
             
             # Wait for table to be visible
@@ -552,19 +629,19 @@ class EBoekhoudenClient:
                             if container:
                                 self.browser_logger.info(f"Found export button with selector: {selector} on attempt {attempt + 1}")
                                 break
-                        except TimeoutError:
+                        except PlaywrightTimeoutError:
                             pass
                     
                     if not container:
                         attempt += 1
                         if attempt < max_attempts:
-                            self.browser_logger.info(f"Export button not found, attempt {attempt}/{max_attempts}")
+                            self.browser_logger.debug("Export button not found, attempt %d/%d", attempt, max_attempts)
                             self._page.wait_for_timeout(100)  # Wait 500ms before next attempt
                             
                 if not container:
                     self.browser_logger.error(f"Export button container not found after {max_attempts} attempts")
                     self._save_page_content("export_button_container_not_found")
-                    self._page.screenshot(path="error_export_button_container_not_found.png")
+                    self._take_screenshot("error_export_button_container_not_found")
                     return "", []
                 
                 self.browser_logger.info("Clicking export button")
@@ -588,8 +665,8 @@ class EBoekhoudenClient:
                         
                         # Save parsed events as JSON
                         json_path = os.path.join(output_dir, f"e-boekhouden_events_{year}_{timestamp}.json")
-                        with open(json_path, 'w', encoding='utf-8') as f:
-                            json.dump(events, f, indent=2, ensure_ascii=False)
+                        with open(json_path, 'wb') as f:
+                            f.write(orjson.dumps(events, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE))
                         
                         self.browser_logger.info(f"Successfully parsed {len(events)} events from XLS and saved to {json_path}")
                         return download_path, events
@@ -603,20 +680,15 @@ class EBoekhoudenClient:
         except Exception as e:
             self.browser_logger.error(f"Failed to download XLS: {str(e)}")
             self._save_page_content("error_download_xls")
-            self._page.screenshot(path="error_download_xls.png")
+            self._take_screenshot("error_download_xls", force=True)
             return "", []
 
     def _parse_hours_xls(self, xls_path: str) -> list[dict]:
         """Parse hours XLS file into list of event dictionaries conforming to events schema."""
-        import pandas as pd
-        from datetime import datetime
-        import pytz
-        import numpy as np
-        
-        self.browser_logger.info(f"Parsing XLS file: {xls_path}")
+        self.browser_logger.info("Parsing XLS file: %s", xls_path)
         try:
             # Read all data from the Excel file
-            df = pd.read_excel(xls_path)
+            df = pd.read_excel(xls_path, engine="calamine")
             
             # Find the row index where the actual data starts (after "Datum" header)
             start_idx = df.index[df.iloc[:, 0] == "Datum"].tolist()[0] + 1
@@ -628,36 +700,47 @@ class EBoekhoudenClient:
             # Remove rows with NaN in critical columns
             data_df = data_df.dropna(subset=["Datum", "Medewerker", "Project", "Activiteit"])
             
-            events = []
-            current_time = datetime.now(pytz.UTC).isoformat()
-            
-            for _, row in data_df.iterrows():
-                try:
-                    # Replace NaN with empty string for string fields
-                    description = str(row["Omschrijving"]) if not pd.isna(row["Omschrijving"]) else ""
+            # Fix the column types once, so the events need no per-value casts
+            data_df = data_df.astype(XLS_COLUMN_DTYPES)
+            
+            # A non-numeric hours cell only drops its own row instead of failing the whole parse
+            data_df["Aantal uren"] = pd.to_numeric(data_df["Aantal uren"], errors="coerce")
+            invalid_hours = data_df["Aantal uren"].isna()
+            if invalid_hours.any():
+                self.browser_logger.warning("Skipping %d rows with non-numeric hours", int(invalid_hours.sum()))
+                data_df = data_df[~invalid_hours]
+            data_df["Omschrijving"] = data_df["Omschrijving"].fillna("")
+            
+            # Fields that are identical for every event parsed in this run
+            current_time = datetime.now(timezone.utc).isoformat()
+            constant_fields = {
+                "last_modified": current_time,
+                "is_deleted": False,
+                "created_at": current_time,
+                "updated_at": current_time,
+            }
+            
+            # Build the event columns in one pass over the whole frame
+            data_df = data_df.rename(columns={
+                "Medewerker": "user_name",
+                "Project": "project",
+                "Activiteit": "activity",
+                "Omschrijving": "description",
+                "Aantal uren": "hours",
+            })
+            data_df["subject"] = data_df["project"].str.cat(data_df["activity"], sep=" - ")
+            data_df = data_df.assign(**constant_fields)
+            
+            events = data_df[[
+                "user_name", "subject", "description", "hours", "last_modified",
+                "is_deleted", "created_at", "updated_at", "project", "activity"
+            ]].to_dict(orient="records")
                     
-                    event = {
-                        "user_name": str(row["Medewerker"]),
-                        "subject": f"{row['Project']} - {row['Activiteit']}",
-                        "description": description,
-                        "hours": float(row["Aantal uren"]),
-                        "last_modified": current_time,
-                        "is_deleted": False,
-                        "created_at": current_time,
-                        "updated_at": current_time,
-                        "project": str(row["Project"]),
-                        "activity": str(row["Activiteit"])
-                    }
-                    events.append(event)
-                except Exception as e:
-                    self.browser_logger.warning(f"Failed to parse row: {row.to_dict()} - Error: {str(e)}")
-                    continue
-                    
-            self.browser_logger.info(f"Successfully parsed {len(events)} events from XLS")
+            self.browser_logger.info("Successfully parsed %d events from XLS", len(events))
             return events
             
         except Exception as e:
-            self.browser_logger.error(f"Failed to parse XLS file: {str(e)}")
+            self.browser_logger.error("Failed to parse XLS file: %s", e)
             return []
             
     def events_differ(self, db_event: dict, eb_event: dict) -> bool:
@@ -748,95 +831,109 @@ class EBoekhoudenClient:
             self.browser_logger.error(f"Error getting event differences: {str(e)}")
             return {"error": str(e)}
 
-    def _wait_for_table(self) -> Optional[ElementHandle]:
-        """Wait for the table to be visible with retry mechanism."""
-        max_attempts = 60
-        attempt = 0
-        table = None
+    def _navigate_and_select_year(self, year: int) -> bool:
+        """Navigate to the hours overview and select the given year.
         
-        while attempt < max_attempts and not table:
-            try:
-                table = self._page.wait_for_selector('app-grid table.table-v1', 
-                                                   state='visible',
-                                                   timeout=100)
-                if table:
-                    self.browser_logger.info(f"Found table on attempt {attempt + 1}")
-                    break
-            except TimeoutError:
-                pass
+        Args:
+            year: The year to select
             
-            attempt += 1
-            if attempt < max_attempts:
-                self.browser_logger.info(f"Table not found, attempt {attempt}/{max_attempts}")
-                self._page.wait_for_timeout(100)
+        Returns:
+            bool: True if the year was selected and confirmed, False otherwise
+        """
+        # Navigate to hours overview
+        self._page.goto(f"{config.eboekhouden.base_url}/uren/overzicht")
+        if not self._wait_for_main_content():
+            return False
         
-        if not table:
-            self.browser_logger.error("Table not found after max attempts")
-            self._save_page_content("table_not_found")
-            self._page.screenshot(path="error_table_not_found.png")
+        # Find and click year radio button
+        self.browser_logger.info("Looking for year radio button")
+        try:
+            self._loc.year_radio.wait_for(state='visible', timeout=config.browser.default_timeout)
+        except PlaywrightTimeoutError:
+            self.browser_logger.error("Year radio button not found")
+            self._save_page_content("year_radio_not_found")
+            self._take_screenshot("error_year_radio_not_found")
+            return False
+        self._loc.year_radio.click()
         
-        return table
-
-    def _click_verder_button(self) -> bool:
-        """Click the Verder button with retry mechanism."""
-        max_attempts = 60
+        # Find and select the year from dropdown with retry
+        self.browser_logger.info(f"Selecting year {year}")
         attempt = 0
-        success = False
+        year_select = None
         
-        while attempt < max_attempts and not success:
+        while attempt < config.retry.max_attempts and not year_select:
             try:
-                verder_button = self._page.locator('button.button.form-submit span:has-text("Verder")')
-                if verder_button:
-                    self.browser_logger.info(f"Found Verder button on attempt {attempt + 1}")
-                    verder_button.click()
-                    
-                    # Wait for network activity to settle
-                    try:
-                        self._page.wait_for_load_state('networkidle', timeout=1000)
-                        success = True
-                        break
-                    except TimeoutError:
-                        pass
-            except Exception:
+                # Try to find enabled dropdown
+                year_select = self._page.wait_for_selector('select.form-select.rect#input-year:not([disabled])', 
+                                                       state='visible',
+                                                       timeout=config.retry.delay_ms)
+                if year_select:
+                    self.browser_logger.info(f"Found enabled year dropdown on attempt {attempt + 1}")
+                    break
+            except PlaywrightTimeoutError:
                 pass
             
             attempt += 1
-            if attempt < max_attempts:
-                self.browser_logger.info(f"Verder button not clicked successfully, attempt {attempt}/{max_attempts}")
-                self._page.wait_for_timeout(100)
+            if attempt < config.retry.max_attempts:
+                self.browser_logger.debug("Year dropdown not found or not enabled, attempt %d/%d", attempt, config.retry.max_attempts)
+                self._page.wait_for_timeout(config.retry.delay_ms)
+            
+        if not year_select:
+            self.browser_logger.error("Year dropdown not found or not enabled after max attempts")
+            self._save_page_content("year_dropdown_not_found")
+            self._take_screenshot("error_year_dropdown_not_found")
+            return False
         
-        if not success:
-            self.browser_logger.error("Failed to click Verder button after max attempts")
-            self._save_page_content("verder_button_error")
-            self._page.screenshot(path="error_verder_button.png")
+        # The value format is "index: year", so map each option's text to its value
+        year_options = year_select.evaluate(
+            "select => Object.fromEntries(Array.from(select.options).map(o => [o.text.trim(), o.value]))"
+        )
         
-        return success
-
-    def _wait_for_main_content(self) -> Optional[ElementHandle]:
-        """Wait for main content to be visible with retry mechanism."""
-        max_attempts = 60
-        attempt = 0
-        content = None
+        target_value = year_options.get(str(year))
+        if not target_value:
+            self.browser_logger.error(f"Year {year} not found in dropdown")
+            self._save_page_content("year_not_found")
+            self._take_screenshot("error_year_not_found")
+            return False
         
-        while attempt < max_attempts and not content:
-            try:
-                content = self._page.wait_for_selector('app-grid', 
-                                                     state='visible',
-                                                     timeout=100)
-                if content:
-                    self.browser_logger.info(f"Found main content on attempt {attempt + 1}")
-                    break
-            except TimeoutError:
-                pass
-            
-            attempt += 1
-            if attempt < max_attempts:
-                self.browser_logger.info(f"Main content not found, attempt {attempt}/{max_attempts}")
-                self._page.wait_for_timeout(100)
+        self.browser_logger.info(f"Selecting year value: {target_value}")
+        year_select.select_option(target_value)
         
-        if not content:
-            self.browser_logger.error("Main content not found after max attempts")
-            self._save_page_content("content_not_found")
-            self._page.screenshot(path="error_content_not_found.png")
+        # Click the "Verder" button to confirm selection
+        return self._click_verder_button()
+
+    def _wait_visible(self, selector: str, debug_name: str, timeout: int = 6000) -> Optional[ElementHandle]:
+        """Wait once for an element to be visible, saving debug output when it does not appear."""
+        locator = self._page.locator(selector)
+        try:
+            locator.wait_for(state='visible', timeout=timeout)
+            return locator.element_handle()
+        except PlaywrightTimeoutError:
+            self.browser_logger.error(f"Element {selector} not visible within {timeout} ms")
+            self._save_page_content(f"{debug_name}_not_found")
+            self._take_screenshot(f"error_{debug_name}_not_found")
+            return None
+
+    def _wait_for_table(self) -> Optional[ElementHandle]:
+        """Wait for the hours table to be visible."""
+        return self._wait_visible('app-grid table.table-v1', 'table')
+
+    def _click_verder_button(self) -> bool:
+        """Click the Verder button once it is enabled."""
+        verder_button = self._loc.verder
+        try:
+            expect(verder_button).to_be_enabled(timeout=6000)
+            verder_button.click()
+            self.browser_logger.debug("Clicked Verder button")
+        except (AssertionError, PlaywrightTimeoutError):
+            self.browser_logger.error("Failed to click Verder button within timeout")
+            self._save_page_content("verder_button_error")
+            self._take_screenshot("error_verder_button")
+            return False
         
-        return content 
\ No newline at end of file
+        # The overview is ready once the hours table is shown, trackers keep the network busy much longer
+        return self._wait_for_table() is not None
+
+    def _wait_for_main_content(self) -> Optional[ElementHandle]:
+        """Wait for the main content to be visible."""
+        return self._wait_visible('app-grid', 'content')
\ No newline at end of file
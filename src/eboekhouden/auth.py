@@ -1,7 +1,11 @@
 """Authentication functions for e-boekhouden client."""
+import os
+from datetime import datetime
 from typing import Optional
 import logging
 
+from playwright.sync_api import TimeoutError
+
 class EBoekhoudenAuth:
     """Authentication mixin for e-boekhouden client."""
 
@@ -24,7 +28,7 @@ class EBoekhoudenAuth:
                 
         if not login_frame:
             self.browser_logger.error("Could not find login frame")
-            self.save_page_content("login_frame_not_found")
+            self.save_page_content("login_frame_not_found", frames=True)
             self.take_screenshot("login_frame_not_found")
             return None
 
@@ -34,7 +38,7 @@ class EBoekhoudenAuth:
         
         if username.count() == 0 or password.count() == 0:
             self.browser_logger.error("Could not find login form elements")
-            self.save_page_content("login_frame_not_found")
+            self.save_page_content("login_frame_not_found", frames=True)
             self.take_screenshot("login_frame_not_found")
             return None
 
@@ -43,8 +47,55 @@ class EBoekhoudenAuth:
         self.take_screenshot("login_frame_found")
         return login_frame
 
+    def load_session_state(self) -> Optional[str]:
+        """Return the path of the saved session state if it exists and is still fresh."""
+        session_path = self._config.directories.session_path
+        if not os.path.exists(session_path):
+            return None
+
+        age_seconds = datetime.now().timestamp() - os.path.getmtime(session_path)
+        if age_seconds > self._config.eboekhouden.session_ttl_hours * 3600:
+            self.browser_logger.info("Saved session state expired, a fresh login is required")
+            return None
+
+        self.browser_logger.info(f"Restoring session state from {session_path}")
+        return str(session_path)
+
+    def save_session_state(self):
+        """Persist the context's cookies and storage so later runs can skip the login."""
+        try:
+            self._context.storage_state(path=str(self._config.directories.session_path))
+        except Exception as e:
+            self.browser_logger.warning(f"Could not save session state: {str(e)}")
+
+    def is_logged_in(self) -> bool:
+        """Check whether the restored session still gives access to the hours overview."""
+        try:
+            self._page.goto(f"{self._config.eboekhouden.base_url}/uren/overzicht", wait_until='domcontentloaded')
+            if any(frame.url and "inloggen.asp" in frame.url for frame in self._page.frames):
+                return False
+            self._page.wait_for_selector('app-grid', state='attached')
+            return True
+        except Exception:
+            return False
+
     def perform_login(self, username: str, password: str) -> bool:
-        """Perform login with given credentials."""
+        """Perform login with given credentials, reusing a saved session when it is still valid."""
+        if self._session_restored:
+            # Only trust the restored session once, fall back to a full login when it is stale
+            self._session_restored = False
+            if self.is_logged_in():
+                self.browser_logger.info("Restored session is still logged in, skipping login")
+                return True
+            self.browser_logger.info("Restored session is no longer valid, logging in again")
+
+        logged_in = self._login_with_credentials(username, password)
+        if logged_in:
+            self.save_session_state()
+        return logged_in
+
+    def _login_with_credentials(self, username: str, password: str) -> bool:
+        """Log in through the login form."""
         self.browser_logger.info("Performing login...")
 
         # Navigate to login page
@@ -65,14 +116,17 @@ class EBoekhoudenAuth:
             username_input.fill(username)
             password_input.fill(password)
 
-            # Click login and wait for navigation
+            # Click login, the menu wait below covers the navigation that follows
             submit_button.click()
             
-            # Wait for page to load
-            self._page.wait_for_load_state('networkidle', timeout=30000)
-            
-            # Wait a bit for frames to load
-            self._page.wait_for_timeout(5000)
+            # After login the app is a frameset, so wait for the menu inside the menu frame
+            try:
+                self._page.frame_locator('frame[name="menuframe"]').locator('.eb-icon-menu-support').first.wait_for(
+                    state='visible', timeout=30000)
+                self.browser_logger.info("Login successful - found menu in menu frame")
+                return True
+            except TimeoutError:
+                self.browser_logger.debug("Menu not found in menu frame, checking all frames")
 
             # Check for menu elements in any frame
             for frame in self._page.frames:
@@ -94,12 +148,12 @@ class EBoekhoudenAuth:
                     continue
 
             self.browser_logger.error("Login failed - no menu elements found in any frame")
-            self.save_page_content("login_failed")
+            self.save_page_content("login_failed", frames=True)
             self.take_screenshot("login_failed")
             return False
 
         except Exception as e:
             self.browser_logger.error(f"Error during login: {str(e)}")
-            self.save_page_content("login_error")
+            self.save_page_content("login_error", frames=True)
             self.take_screenshot("login_error")
             return False 
\ No newline at end of file
@@ -2,6 +2,7 @@
 
 import os
 import logging
+from contextlib import contextmanager
 from typing import Optional
 from playwright.sync_api import ElementHandle
 from src.config import config
@@ -22,4 +23,17 @@ class EBoekhoudenBase:
     def take_screenshot(self, name: str):
         """Take a screenshot and save it in the temp/screenshots directory."""
         screenshot_path = os.path.join(config.directories.screenshots_dir, f"{name}.png")
-        self._page.screenshot(path=screenshot_path) 
\ No newline at end of file
+        self._page.screenshot(path=screenshot_path)
+
+    @contextmanager
+    def playwright_step(self, debug_name: str, description: str):
+        """Log which browser step failed, then re-raise.
+        
+        The page state is kept by the Playwright trace of the surrounding flow,
+        so no HTML dump or screenshot is taken here.
+        """
+        try:
+            yield
+        except Exception as e:
+            self.browser_logger.error("%s (%s): %s", description, debug_name, e)
+            raise
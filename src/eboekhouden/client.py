@@ -11,6 +11,8 @@ from .utils import EBoekhoudenUtils
 from .hours import EBoekhoudenHours
 from .events import EBoekhoudenEvents
 
+BLOCKED_RESOURCE_TYPES = ("image", "font", "media")
+
 class EBoekhoudenClient(EBoekhoudenAuth, EBoekhoudenUtils, EBoekhoudenHours, EBoekhoudenEvents):
     """Client for interacting with e-boekhouden.nl."""
     
@@ -30,6 +32,11 @@ class EBoekhoudenClient(EBoekhoudenAuth, EBoekhoudenUtils, EBoekhoudenHours, EBo
         self._browser = None
         self._context = None
         self._page = None
+        self._main_frame = None
+        self._session_restored = False
+        
+        # Export URLs seen per year, so repeated downloads can skip the UI
+        self._export_urls = {}
         
         # Set up logging
         self.browser_logger = logging.getLogger('browser')
@@ -53,16 +60,27 @@ class EBoekhoudenClient(EBoekhoudenAuth, EBoekhoudenUtils, EBoekhoudenHours, EBo
             # Launch browser
             self._browser = self._playwright.chromium.launch(
                 headless=config.browser.headless,
-                slow_mo=config.browser.slow_mo
+                slow_mo=config.browser.slow_mo,
+                # Downloads land on the output filesystem, so moving them into place is a rename
+                downloads_path=config.directories.output_dir
             )
             
+            # Reuse a recent session from a previous run to skip the login round-trips
+            storage_state = self.load_session_state()
+            self._session_restored = storage_state is not None
+            
             # Create context with viewport and downloads
             self._context = self._browser.new_context(
                 viewport={'width': config.browser.viewport_width, 
                          'height': config.browser.viewport_height},
-                accept_downloads=True
+                accept_downloads=True,
+                storage_state=storage_state
             )
             
+            # Optionally skip images, fonts and media; routing disables the HTTP cache, so this is off by default
+            if config.browser.block_assets:
+                self._context.route("**/*", self._route_request)
+            
             # Create page with user agent and timeouts
             self._page = self._context.new_page()
             self._page.set_default_timeout(config.browser.default_timeout)
@@ -80,6 +98,13 @@ class EBoekhoudenClient(EBoekhoudenAuth, EBoekhoudenUtils, EBoekhoudenHours, EBo
             self.cleanup()
             raise
     
+    @staticmethod
+    def _route_request(route):
+        """Abort requests for images, fonts and media, stylesheets still load so visibility checks hold."""
+        if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+            return route.abort()
+        return route.continue_()
+    
     def cleanup(self):
         """Clean up browser resources."""
         try:
@@ -98,6 +123,7 @@ class EBoekhoudenClient(EBoekhoudenAuth, EBoekhoudenUtils, EBoekhoudenHours, EBo
             self.browser_logger.error(f"Error during cleanup: {str(e)}")
         finally:
             self._page = None
+            self._main_frame = None
             self._context = None
             self._browser = None
             self._playwright = None
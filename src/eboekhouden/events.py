@@ -1,11 +1,38 @@
 """Events management functions for e-boekhouden client."""
 
+import ctypes
+import gc
 import logging
-from typing import List, Dict, Optional, Tuple
+import re
+import sys
+from collections import defaultdict
+from typing import Iterator, List, Dict, Optional, Tuple
 from datetime import datetime
-from src.config import config
+from python_calamine import CalamineWorkbook
 from .base import EBoekhoudenBase
 
+# Event id that the sync writes into the description of every e-boekhouden registration
+_EVENT_ID_RE = re.compile(r'event_id:\s*([^\s\]]+)')
+
+# Header names of the hours export columns, by event field
+_XLS_HEADERS = {
+    'date': 'Datum',
+    'user': 'Medewerker',
+    'project': 'Project',
+    'activity': 'Activiteit',
+    'description': 'Omschrijving',
+    'hours': 'Aantal uren',
+}
+
+def _release_memory() -> None:
+    """Collect garbage and return freed heap pages to the OS where glibc allows it."""
+    gc.collect()
+    if sys.platform.startswith("linux"):
+        try:
+            ctypes.CDLL("libc.so.6").malloc_trim(0)
+        except (OSError, AttributeError):
+            pass
+
 class EBoekhoudenEvents(EBoekhoudenBase):
     """Events management methods for EBoekhoudenClient."""
     
@@ -24,46 +51,113 @@ class EBoekhoudenEvents(EBoekhoudenBase):
         """
         events_to_add = []
         events_to_update = []
-        orphaned_events = []
         
-        # Track processed events to identify orphans
+        # Index e-boekhouden events once, so every database event is matched with dict lookups
+        eb_by_event_id: Dict[str, List[int]] = defaultdict(list)
+        eb_by_key: Dict[tuple, List[int]] = defaultdict(list)
+        eb_dates: Dict[int, float] = {}
+        for index, eb_event in enumerate(eb_events):
+            if eb_event.get('event_id'):
+                eb_by_event_id[eb_event['event_id']].append(index)
+            eb_date = self._to_timestamp(eb_event.get('date'))
+            if eb_date is not None:
+                eb_dates[index] = eb_date
+                eb_by_key[self._match_key(eb_event, self._day(eb_date))].append(index)
+        
+        # Parse modification times once instead of on every comparison
+        eb_modified = [self._to_timestamp(eb_event.get('last_modified')) for eb_event in eb_events]
+        
+        # Track processed events (by position) to identify orphans
         processed_eb_events = set()
         
-        # First pass - find matches and identify events to add/update
         for db_event in db_events:
-            found_match = False
-            
-            for eb_event in eb_events:
-                # Skip already processed events
-                if eb_event['id'] in processed_eb_events:
-                    continue
-                    
-                # Check for event_id match
-                if 'event_id' in eb_event and eb_event['event_id'] == db_event['event_id']:
-                    found_match = True
-                    processed_eb_events.add(eb_event['id'])
-                    
-                    # Check if update needed
-                    if self.needs_update(db_event, eb_event):
-                        events_to_update.append((db_event, eb_event))
-                    break
-                    
-                # Check for content match if no event_id
-                elif self.events_match(db_event, eb_event):
-                    found_match = True
-                    processed_eb_events.add(eb_event['id'])
-                    break
+            # Check for event_id match
+            index = self._first_unprocessed(eb_by_event_id.get(db_event.get('event_id'), []), processed_eb_events)
+            if index is not None:
+                processed_eb_events.add(index)
+                
+                # Check if update needed (database event is newer)
+                db_modified = self._to_timestamp(db_event.get('last_modified'))
+                if self._is_newer(db_modified, eb_modified[index]):
+                    events_to_update.append((db_event, eb_events[index]))
+                continue
             
-            if not found_match:
+            # Check for content match if no event_id
+            index = self._find_content_match(db_event, eb_events, eb_by_key, eb_dates, processed_eb_events)
+            if index is not None:
+                processed_eb_events.add(index)
+            else:
                 events_to_add.append(db_event)
         
-        # Second pass - identify orphaned events
-        for eb_event in eb_events:
-            if eb_event['id'] not in processed_eb_events:
-                orphaned_events.append(eb_event)
+        # Events that were never matched are orphans
+        orphaned_events = [eb_event for index, eb_event in enumerate(eb_events) if index not in processed_eb_events]
         
         return events_to_add, events_to_update, orphaned_events
 
+    @staticmethod
+    def _to_timestamp(value: Optional[str]) -> Optional[float]:
+        """Parse an ISO date string to epoch seconds, returning None when it is missing or invalid."""
+        if not value:
+            return None
+        try:
+            return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _day(timestamp: float) -> int:
+        """Return the day number of an epoch timestamp."""
+        return int(timestamp // 86400)
+
+    @staticmethod
+    def _is_newer(db_modified: Optional[float], eb_modified: Optional[float]) -> bool:
+        """Check whether the database modification time is later than the e-boekhouden one."""
+        return db_modified is not None and eb_modified is not None and db_modified > eb_modified
+
+    @staticmethod
+    def _match_key(event: Dict, day: int, cents_offset: int = 0) -> tuple:
+        """Build the content bucket key used to match events without an event_id.
+        
+        Hours are bucketed in whole hundredths; cents_offset selects a neighbouring bucket.
+        """
+        return (event['project'], event['activity'], round(event['hours'] * 100) + cents_offset, day)
+
+    @staticmethod
+    def _prune_processed(indices: List[int], processed: set) -> List[int]:
+        """Drop matched indices from an index bucket, so later lookups do not scan them again."""
+        if any(index in processed for index in indices):
+            indices[:] = [index for index in indices if index not in processed]
+        return indices
+
+    def _first_unprocessed(self, indices: List[int], processed: set) -> Optional[int]:
+        """Return the first index that has not been matched yet."""
+        indices = self._prune_processed(indices, processed)
+        return indices[0] if indices else None
+
+    def _find_content_match(self, db_event: Dict, eb_events: List[Dict], eb_by_key: Dict[tuple, List[int]],
+                            eb_dates: Dict[int, float], processed: set) -> Optional[int]:
+        """Find the first unmatched e-boekhouden event that events_match would accept."""
+        db_date = self._to_timestamp(db_event.get('start_date'))
+        if db_date is None:
+            return None
+        
+        # Hours within 0.01 of each other can round up to two hundredths apart,
+        # so the neighbouring hour buckets are probed just like the neighbouring days
+        day = self._day(db_date)
+        candidates = []
+        for day_offset in (-1, 0, 1):
+            for cents_offset in (-2, -1, 0, 1, 2):
+                bucket = eb_by_key.get(self._match_key(db_event, day + day_offset, cents_offset))
+                if not bucket:
+                    continue
+                for index in self._prune_processed(bucket, processed):
+                    if (abs(db_date - eb_dates[index]) <= 86400
+                            and abs(db_event['hours'] - eb_events[index]['hours']) <= 0.01):
+                        candidates.append(index)
+        
+        # Prefer the earliest event, like a sequential scan would
+        return min(candidates) if candidates else None
+
     def events_match(self, db_event: Dict, eb_event: Dict) -> bool:
         """Check if two events match based on content.
         
@@ -85,9 +179,9 @@ class EBoekhoudenEvents(EBoekhoudenBase):
             return False
             
         # Compare dates within 24 hours
-        db_date = datetime.fromisoformat(db_event['start_date'].replace('Z', '+00:00'))
-        eb_date = datetime.fromisoformat(eb_event['date'].replace('Z', '+00:00'))
-        if abs((db_date - eb_date).total_seconds()) > 86400:  # 24 hours in seconds
+        db_date = self._to_timestamp(db_event['start_date'])
+        eb_date = self._to_timestamp(eb_event['date'])
+        if db_date is None or eb_date is None or abs(db_date - eb_date) > 86400:  # 24 hours in seconds
             return False
         
         return True
@@ -102,15 +196,9 @@ class EBoekhoudenEvents(EBoekhoudenBase):
         Returns:
             True if event needs update, False otherwise
         """
-        # Compare last modified timestamps
-        db_modified = datetime.fromisoformat(db_event['last_modified'].replace('Z', '+00:00'))
-        eb_modified = datetime.fromisoformat(eb_event['last_modified'].replace('Z', '+00:00'))
-        
         # If database event is newer, update needed
-        if db_modified > eb_modified:
-            return True
-        
-        return False
+        return self._is_newer(self._to_timestamp(db_event['last_modified']),
+                              self._to_timestamp(eb_event['last_modified']))
 
     def parse_hours_xls(self, xls_path: str) -> List[Dict]:
         """Parse hours from XLS file into list of events.
@@ -121,37 +209,78 @@ class EBoekhoudenEvents(EBoekhoudenBase):
         Returns:
             List of event dictionaries
         """
+        sheet = None
         try:
-            import pandas as pd
-            
-            # Read XLS file
-            df = pd.read_excel(xls_path)
+            sheet = CalamineWorkbook.from_path(xls_path).get_sheet_by_index(0)
             
-            # Map column names
-            column_map = config.eboekhouden.table_columns
-            
-            events = []
-            for _, row in df.iterrows():
-                event = {
-                    'id': str(row[column_map['id']]),
-                    'user_name': str(row[column_map['user']]),
-                    'project': str(row[column_map['project']]),
-                    'activity': str(row[column_map['activity']]),
-                    'hours': float(row[column_map['hours']]),
-                    'description': str(row[column_map['description']]),
-                    'date': str(row[column_map['date']]),
-                    'last_modified': str(row[column_map['last_modified']]),
-                    'created_at': datetime.now().isoformat()
-                }
-                
-                # Extract event_id from description if present
-                if 'event_id:' in event['description']:
-                    event['event_id'] = event['description'].split('event_id:')[1].strip()
-                
-                events.append(event)
-                
+            # The sheet knows its row count, so the list is allocated once and trimmed to the events found
+            events = [None] * max(sheet.height - 1, 0)
+            size = 0
+            for size, event in enumerate(self._iter_sheet_events(sheet), 1):
+                if size <= len(events):
+                    events[size - 1] = event
+                else:
+                    events.append(event)
+            del events[size:]
             return events
-            
         except Exception as e:
             self.browser_logger.error(f"Failed to parse XLS file: {str(e)}")
-            return [] 
\ No newline at end of file
+            return []
+        finally:
+            # Drop the last reference to the sheet data, then hand its memory back before the next year is parsed
+            sheet = None
+            _release_memory()
+
+    def _iter_sheet_events(self, sheet) -> Iterator[Dict]:
+        """Yield events from the rows of an hours export sheet."""
+        rows = sheet.iter_rows()
+        
+        # Title rows come first, the column headers are on the row that starts with "Datum"
+        header = next((row for row in rows if row and row[0] == _XLS_HEADERS['date']), None)
+        if header is None:
+            self.browser_logger.error("No header row found in XLS file")
+            return
+        
+        # Map the event fields to their position in the header row
+        fields = ('user', 'project', 'activity', 'hours', 'description', 'date')
+        positions = [header.index(_XLS_HEADERS[field]) for field in fields]
+        # The export has no modification time, so the parse time stands in for it
+        created_at = datetime.now().isoformat()
+        
+        for row in rows:
+            user, project, activity, hours, description, date = (row[p] for p in positions)
+            
+            # Totals and blank rows have no employee, project or activity
+            if not (user and project and activity):
+                continue
+            try:
+                hours = float(hours)
+            except (TypeError, ValueError):
+                self.browser_logger.warning(f"Skipping XLS row with non-numeric hours: {hours!r}")
+                continue
+            
+            event = {
+                # Names and labels recur across rows and years, so every value is stored only once
+                'user_name': sys.intern(str(user)),
+                'project': sys.intern(str(project)),
+                'activity': sys.intern(str(activity)),
+                'hours': hours,
+                'description': str(description),
+                'date': self._cell_date(date),
+                'last_modified': created_at,
+                'created_at': created_at
+            }
+            
+            # Extract event_id from description if present
+            match = _EVENT_ID_RE.search(event['description'])
+            if match:
+                event['event_id'] = match.group(1)
+            
+            yield event
+
+    @staticmethod
+    def _cell_date(value) -> str:
+        """Convert a date cell to ISO text, calamine returns real dates for date-formatted cells."""
+        if hasattr(value, 'isoformat'):
+            return value.isoformat()
+        return str(value)
@@ -2,11 +2,21 @@
 
 import os
 import json
+import shutil
+import time
 import logging
 from typing import Optional, Tuple, List, Dict
 from playwright.sync_api import ElementHandle, Page, TimeoutError
 from src.config import config
 from .base import EBoekhoudenBase
+from .utils import ensure_debug_dir
+
+# Selectors of the hours overview export flow
+YEAR_RADIO_SELECTOR = 'input[type="radio"][value="jaar"]'
+YEAR_SELECT_SELECTOR = 'select.form-select.rect#input-year'
+CONFIRM_BUTTON_SELECTOR = 'button.button.form-submit span:has-text("Verder")'
+EXPORT_BUTTON_SELECTOR = 'app-icon[title="Exporteren naar Excel"]'
+MAIN_FRAME_SELECTOR = 'frame[name="mainframe"]'
 
 class EBoekhoudenHours(EBoekhoudenBase):
     """Hours management methods for EBoekhoudenClient."""
@@ -22,107 +32,110 @@ class EBoekhoudenHours(EBoekhoudenBase):
             - Path to the downloaded XLS file
             - List of event dictionaries parsed from the file
         """
-        self.browser_logger.info(f"Downloading hours for year {year}")
-        
-        # Navigate directly to hours overview
-        self._page.goto(f"{config.eboekhouden.base_url}/uren/overzicht")
+        self.browser_logger.info("Downloading hours for year %s", year)
         
-        # Wait for page to load completely
-        self._page.wait_for_load_state('networkidle')
-        self._page.wait_for_load_state('domcontentloaded')
-        self._page.wait_for_timeout(config.browser.default_timeout)
+        # Replay a known export request without driving the overview UI
+        export_url = self._export_urls.get(year)
+        if export_url:
+            xls_path = self._download_export_direct(year, export_url)
+            if xls_path:
+                return xls_path, self.parse_hours_xls(xls_path)
         
-        # Log all frames for debugging
-        self.browser_logger.info("Available frames:")
-        for frame in self._page.frames:
-            self.browser_logger.info(f"Frame: {frame.name} - URL: {frame.url}")
-            
-        # Wait for main frame to load
-        main_frame = self._page.frame_locator('frame[name="mainframe"]').first
-        if not main_frame:
-            self.browser_logger.error("Could not find main frame")
-            self.save_page_content("main_frame_not_found")
-            self.take_screenshot("main_frame_not_found")
-            raise Exception("Could not find main frame")
-            
-        # Wait for year radio button
+        # Trace only the UI flow, the trace is only written to disk when a step fails
+        self._context.tracing.start(screenshots=True, snapshots=True, sources=False)
         try:
-            year_radio = main_frame.wait_for_selector('input[type="radio"][value="jaar"]', state='visible', timeout=config.browser.default_timeout)
-            if not year_radio:
-                self.browser_logger.error("Could not find year radio button")
-                self.save_page_content("year_radio_not_found")
-                self.take_screenshot("year_radio_not_found")
-                raise Exception("Could not find year radio button")
-            year_radio.click()
-        except Exception as e:
-            self.browser_logger.error(f"Error clicking year radio: {str(e)}")
-            self.save_page_content("year_radio_error")
-            self.take_screenshot("year_radio_error")
+            result = self._download_hours_xls_ui(year)
+        except Exception:
+            trace_path = ensure_debug_dir() / f"trace_download_{year}.zip"
+            self._context.tracing.stop(path=trace_path)
+            self.browser_logger.error("Saved trace of the failed download to %s", trace_path)
             raise
+        self._context.tracing.stop()
+        return result
+
+    def _download_hours_xls_ui(self, year: int) -> Tuple[str, List[Dict]]:
+        """Download the hours XLS by driving the overview page."""
+        # Navigate directly to hours overview
+        # Background polling keeps the network busy, the locators below auto-wait for their elements
+        self._page.goto(f"{config.eboekhouden.base_url}/uren/overzicht", wait_until='domcontentloaded')
+        
+        # Log all frames for debugging
+        if self.browser_logger.isEnabledFor(logging.DEBUG):
+            self.browser_logger.debug("Available frames:")
+            for frame in self._page.frames:
+                self.browser_logger.debug("Frame: %s - URL: %s", frame.name, frame.url)
+            
+        # Frame locators are resolved lazily, so one handle stays valid across navigations
+        if self._main_frame is None:
+            self._main_frame = self._page.frame_locator(MAIN_FRAME_SELECTOR).first
+        main_frame = self._main_frame
+            
+        # Click year radio button
+        with self.playwright_step("year_radio_error", "Error clicking year radio"):
+            main_frame.locator(YEAR_RADIO_SELECTOR).click(timeout=config.browser.default_timeout)
             
         # Select year from dropdown
-        try:
-            year_select = main_frame.wait_for_selector('select.form-select.rect#input-year', state='visible', timeout=config.browser.default_timeout)
-            if not year_select:
-                self.browser_logger.error("Could not find year select")
-                self.save_page_content("year_select_not_found")
-                self.take_screenshot("year_select_not_found")
-                raise Exception("Could not find year select")
-            year_select.select_option(str(year))
-        except Exception as e:
-            self.browser_logger.error(f"Error selecting year: {str(e)}")
-            self.save_page_content("year_select_error")
-            self.take_screenshot("year_select_error")
-            raise
+        with self.playwright_step("year_select_error", "Error selecting year"):
+            main_frame.locator(YEAR_SELECT_SELECTOR).select_option(str(year), timeout=config.browser.default_timeout)
             
         # Click confirm button
-        try:
-            confirm_button = main_frame.wait_for_selector('button.button.form-submit span:has-text("Verder")', state='visible', timeout=config.browser.default_timeout)
-            if not confirm_button:
-                self.browser_logger.error("Could not find confirm button")
-                self.save_page_content("confirm_button_not_found")
-                self.take_screenshot("confirm_button_not_found")
-                raise Exception("Could not find confirm button")
-            confirm_button.click()
-        except Exception as e:
-            self.browser_logger.error(f"Error clicking confirm button: {str(e)}")
-            self.save_page_content("confirm_button_error")
-            self.take_screenshot("confirm_button_error")
-            raise
+        with self.playwright_step("confirm_button_error", "Error clicking confirm button"):
+            main_frame.locator(CONFIRM_BUTTON_SELECTOR).click(timeout=config.browser.default_timeout)
             
-        # Wait for export button and click it
-        try:
-            export_button = main_frame.wait_for_selector('app-icon[title="Exporteren naar Excel"]', state='visible', timeout=config.browser.default_timeout)
-            if not export_button:
-                self.browser_logger.error("Could not find export button")
-                self.save_page_content("export_button_not_found")
-                self.take_screenshot("export_button_not_found")
-                raise Exception("Could not find export button")
+        # Click export button once it shows up
+        with self.playwright_step("download_error", "Error downloading XLS"):
+            export_button = main_frame.locator(EXPORT_BUTTON_SELECTOR)
 
             # Wait for download
             with self._page.expect_download(timeout=config.browser.download_timeout) as download_info:
-                export_button.click()
+                export_button.click(timeout=config.browser.default_timeout)
             download = download_info.value
+            if download.url.startswith("http"):
+                self._export_urls[year] = download.url
 
             # Save file
             xls_path = os.path.join(config.directories.output_dir, f"e-boekhouden_events_{year}_{self._timestamp}.xls")
-            download.save_as(xls_path)
+            # Move the finished download into place, instead of copying it like save_as does
+            shutil.move(download.path(), xls_path)
 
             # Parse events from XLS
             events = self.parse_hours_xls(xls_path)
             return xls_path, events
 
+    def _download_export_direct(self, year: int, export_url: str) -> Optional[str]:
+        """Fetch the Excel export over HTTP with the session cookies of the browser context.
+        
+        Args:
+            year: The year the export belongs to
+            export_url: URL of an earlier UI-driven export of that year
+            
+        Returns:
+            Path to the downloaded XLS file, or None when the UI flow is needed
+        """
+        try:
+            response = self._context.request.get(export_url, timeout=config.browser.download_timeout)
+            # An expired session answers with the HTML login page instead of the export
+            if not response.ok or "html" in response.headers.get("content-type", ""):
+                self.browser_logger.info("Direct export for year %s failed, falling back to the UI", year)
+                self._export_urls.pop(year, None)
+                return None
+            
+            xls_path = os.path.join(config.directories.output_dir, f"e-boekhouden_events_{year}_{self._timestamp}.xls")
+            with open(xls_path, "wb") as f:
+                f.write(response.body())
+            self.browser_logger.info("Downloaded export for year %s directly to %s", year, xls_path)
+            return xls_path
         except Exception as e:
-            self.browser_logger.error(f"Error downloading XLS: {str(e)}")
-            self.save_page_content("download_error")
-            self.take_screenshot("download_error")
-            raise
+            self.browser_logger.warning("Direct export for year %s failed: %s", year, e)
+            self._export_urls.pop(year, None)
+            return None
 
-    def add_hours_direct(self, event: Dict) -> bool:
+    def add_hours_direct(self, event: Dict, timestamp: Optional[str] = None) -> bool:
         """Add hours directly to e-boekhouden using event data.
         
         Args:
             event: Dictionary containing event data
+            timestamp: "Created at" time for the description, batch callers pass one shared value
             
         Returns:
             True if successful, False otherwise
@@ -138,7 +151,7 @@ class EBoekhoudenHours(EBoekhoudenBase):
             required_fields = ['project', 'activity', 'hours', 'description']
             for field in required_fields:
                 if field not in event:
-                    self.browser_logger.error(f"Missing required field: {field}")
+                    self.browser_logger.error("Missing required field: %s", field)
                     return False
             
             # Fill project
@@ -161,7 +174,8 @@ class EBoekhoudenHours(EBoekhoudenBase):
                 return False
             
             # Add timestamp comment
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            if timestamp is None:
+                timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
             description = f"{event['description']}\n\nCreated at: {timestamp}"
             description_input.fill(description)
             
@@ -179,12 +193,12 @@ class EBoekhoudenHours(EBoekhoudenBase):
                 return True
             except TimeoutError:
                 self.browser_logger.error("Save timed out")
-                self.save_page_content("save_timeout")
+                self.save_page_content("save_timeout", frames=True)
                 self._page.screenshot(path="error_save_timeout.png")
                 return False
                 
         except Exception as e:
-            self.browser_logger.error(f"Failed to add hours: {str(e)}")
-            self.save_page_content("add_hours_error")
+            self.browser_logger.error("Failed to add hours: %s", e)
+            self.save_page_content("add_hours_error", frames=True)
             self._page.screenshot(path="error_add_hours.png")
             return False 
\ No newline at end of file
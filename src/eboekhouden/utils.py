@@ -2,11 +2,27 @@
 
 import os
 import logging
+from pathlib import Path
 from typing import Optional
 from playwright.sync_api import ElementHandle, Page
 from src.config import config
 from datetime import datetime, timedelta
 
+DEBUG_DIR = Path("debug")
+
+# Set once the debug directory has been created, so later dumps skip the makedirs call
+_debug_ready = False
+
+
+def ensure_debug_dir() -> Path:
+    """Create the debug directory on first use."""
+    global _debug_ready
+    if not _debug_ready:
+        DEBUG_DIR.mkdir(parents=True, exist_ok=True)
+        _debug_ready = True
+    return DEBUG_DIR
+
+
 class EBoekhoudenUtils:
     """Utility methods for EBoekhoudenClient."""
 
@@ -18,34 +34,34 @@ class EBoekhoudenUtils:
         if not os.path.exists(debug_dir):
             return
             
-        now = datetime.now()
-        cutoff = now - timedelta(days=1)
+        cutoff_ts = (datetime.now() - timedelta(days=1)).timestamp()
         
-        for filename in os.listdir(debug_dir):
-            filepath = os.path.join(debug_dir, filename)
-            try:
-                mtime = datetime.fromtimestamp(os.path.getmtime(filepath))
-                if mtime < cutoff:
-                    os.remove(filepath)
-                    self.browser_logger.info(f"Removed old debug file: {filename}")
-            except Exception as e:
-                self.browser_logger.error(f"Error removing debug file {filename}: {str(e)}")
+        # scandir entries carry their stat results, so each file is stat'ed at most once
+        with os.scandir(debug_dir) as entries:
+            for entry in entries:
+                try:
+                    if entry.stat().st_mtime < cutoff_ts:
+                        os.remove(entry.path)
+                        self.browser_logger.info("Removed old debug file: %s", entry.name)
+                except Exception as e:
+                    self.browser_logger.error("Error removing debug file %s: %s", entry.name, e)
 
-    def save_page_content(self, name: str) -> None:
-        """Save the current page content to a file."""
+    def save_page_content(self, name: str, frames: bool = False) -> None:
+        """Save the current page content to a file.
+        
+        Args:
+            name: Base name of the saved files
+            frames: Also save the content of every child frame, meant for error paths
+        """
         try:
-            # Create debug directory if it doesn't exist
-            os.makedirs("debug", exist_ok=True)
-            
-            # Save main page content
-            content = self._page.content()
-            filepath = os.path.join("debug", f"{name}.html")
-            with open(filepath, "w", encoding="utf-8") as f:
-                f.write(content)
-            self.browser_logger.info(f"Saved page content to {filepath}")
+            debug_dir = ensure_debug_dir()
             
-            # Try to save frame contents
-            for i, frame in enumerate(self._page.frames):
+            # Collect page and frame contents before writing them
+            files = [(debug_dir / f"{name}.html", self._page.content())]
+            for i, frame in enumerate(self._page.frames if frames else ()):
+                # The main frame is the page itself, blank frames have nothing to show
+                if frame == self._page.main_frame or not frame.url or frame.url == "about:blank":
+                    continue
                 try:
                     frame_content = frame.content()
                     frame_url = frame.url
@@ -54,29 +70,26 @@ class EBoekhoudenUtils:
                         frame_name = f"{name}_login_frame"
                     elif "main" in frame_url.lower():
                         frame_name = f"{name}_main_frame"
-                    
-                    with open(f"debug/{frame_name}.html", "w", encoding="utf-8") as f:
-                        f.write(f"<!-- Frame URL: {frame_url} -->\n")
-                        f.write(frame_content)
-                    self.browser_logger.info(f"Saved frame content to debug/{frame_name}.html")
+                    files.append((debug_dir / f"{frame_name}.html", f"<!-- Frame URL: {frame_url} -->\n{frame_content}"))
                 except Exception as e:
-                    self.browser_logger.warning(f"Could not save frame {i} content: {str(e)}")
+                    self.browser_logger.warning("Could not save frame %d content: %s", i, e)
+            
+            for filepath, text in files:
+                filepath.write_text(text, encoding="utf-8")
+                self.browser_logger.info("Saved page content to %s", filepath)
                     
         except Exception as e:
-            self.browser_logger.error(f"Error saving page content: {str(e)}")
+            self.browser_logger.error("Error saving page content: %s", e)
 
     def take_screenshot(self, name: str) -> None:
         """Take a screenshot of the current page."""
         try:
-            # Create debug directory if it doesn't exist
-            os.makedirs("debug", exist_ok=True)
-            
-            filepath = os.path.join("debug", f"{name}.png")
+            filepath = ensure_debug_dir() / f"{name}.png"
             self._page.screenshot(path=filepath)
-            self.browser_logger.info(f"Saved screenshot to {filepath}")
+            self.browser_logger.info("Saved screenshot to %s", filepath)
             
         except Exception as e:
-            self.browser_logger.error(f"Error taking screenshot: {str(e)}")
+            self.browser_logger.error("Error taking screenshot: %s", e)
 
     def wait_for_table(self, selector: str, timeout: int = 5000) -> bool:
         """Wait for a table element to be visible."""
@@ -84,5 +97,5 @@ class EBoekhoudenUtils:
             self._page.wait_for_selector(selector, state="visible", timeout=timeout)
             return True
         except Exception as e:
-            self.browser_logger.error(f"Error waiting for table: {str(e)}")
+            self.browser_logger.error("Error waiting for table: %s", e)
             return False 
\ No newline at end of file
@@ -1,10 +1,30 @@
+import atexit
 import os
 import logging
-from logging.handlers import RotatingFileHandler
-from typing import Dict, Any, Tuple
-import json
+import queue
+from logging.handlers import MemoryHandler, QueueHandler, QueueListener, RotatingFileHandler
+from typing import Dict, Any, Iterator, Tuple
+import orjson
 from src.config import config
 
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+# Formatters keep no per-record state, so all component handlers share one
+_FORMATTER = logging.Formatter(LOG_FORMAT, datefmt=DATE_FORMAT)
+
+# Buffered file handlers attached by setup_logging, flushed once when the process exits
+_buffered_handlers = []
+
+# Component loggers handed out by get_logger, each with its own log file
+COMPONENTS = {
+    'browser': {'level': 'INFO', 'file': 'browser.log'},
+    'network': {'level': 'INFO', 'file': 'network.log'},
+    'business': {'level': 'INFO', 'file': 'business.log'},
+}
+
+# Components whose logger setup_logging configures, get_logger hands these out unchanged
+_SETUP_COMPONENTS = ('database',)
+
 def setup_logging() -> Tuple[logging.Logger, logging.Logger]:
     """Set up logging configuration."""
     # Create required directories if they don't exist
@@ -14,7 +34,7 @@ def setup_logging() -> Tuple[logging.Logger, logging.Logger]:
     os.makedirs(config.directories.screenshots_dir, exist_ok=True)
 
     # Common format for all loggers
-    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    formatter = logging.Formatter(LOG_FORMAT)
 
     # Console handler
     console_handler = logging.StreamHandler()
@@ -35,8 +55,8 @@ def setup_logging() -> Tuple[logging.Logger, logging.Logger]:
     )
     app_handler.setFormatter(formatter)
     app_logger = logging.getLogger('app')
-    app_logger.handlers.clear()
-    app_logger.addHandler(app_handler)
+    _reset_handlers(app_logger)
+    app_logger.addHandler(_buffered(app_handler))
     app_logger.propagate = False  # Prevent propagation to root logger
 
     # Database operations logger
@@ -47,8 +67,8 @@ def setup_logging() -> Tuple[logging.Logger, logging.Logger]:
     )
     db_handler.setFormatter(formatter)
     db_logger = logging.getLogger('database')
-    db_logger.handlers.clear()
-    db_logger.addHandler(db_handler)
+    _reset_handlers(db_logger)
+    db_logger.addHandler(_buffered(db_handler))
     db_logger.propagate = False
 
     # Error logger (separate file for errors)
@@ -60,16 +80,147 @@ def setup_logging() -> Tuple[logging.Logger, logging.Logger]:
     error_handler.setFormatter(formatter)
     error_handler.setLevel(logging.ERROR)
     error_logger = logging.getLogger('error')
-    error_logger.handlers.clear()
+    _reset_handlers(error_logger)
     error_logger.addHandler(error_handler)
     error_logger.propagate = False  # Prevent propagation to root logger
 
     return root_logger, db_logger
 
+def _buffered(handler: logging.Handler) -> MemoryHandler:
+    """Wrap a file handler so records are written in batches.
+    
+    The buffer is flushed when it is full, on errors, when a later setup_logging
+    call replaces it and when the process exits.
+    """
+    memory_handler = MemoryHandler(capacity=1024, flushLevel=logging.ERROR, target=handler)
+    _buffered_handlers.append(memory_handler)
+    return memory_handler
+
+def _reset_handlers(logger: logging.Logger) -> None:
+    """Flush and close the handlers an earlier setup_logging call attached to logger."""
+    for handler in logger.handlers[:]:
+        logger.removeHandler(handler)
+        # MemoryHandler writes its buffer on close, but leaves its target open
+        target = getattr(handler, 'target', None)
+        handler.close()
+        if target is not None:
+            target.close()
+        if handler in _buffered_handlers:
+            _buffered_handlers.remove(handler)
+
+def _flush_buffered() -> None:
+    """Write out the records still buffered for the setup_logging log files."""
+    for handler in _buffered_handlers:
+        handler.flush()
+
+atexit.register(_flush_buffered)
+
 def get_logger(component: str) -> logging.Logger:
-    """Get a logger for a specific component."""
-    return logging.getLogger(component)
+    """Get a logger for a specific component.
+    
+    The logger only puts records on a queue; a background listener writes them to the
+    component's log file, in batches, and to the console.
+    Handlers are attached on first use only, so repeated calls never stack handlers.
+    Component loggers do not propagate, so records are not written again by the root logger.
+    The database component is the 'database' logger that setup_logging writes to logs/database.log.
+    """
+    if component in _SETUP_COMPONENTS:
+        return logging.getLogger(component)
+    if component not in COMPONENTS:
+        raise ValueError(f"Unknown component '{component}', expected one of {list(COMPONENTS) + list(_SETUP_COMPONENTS)}")
+    settings = COMPONENTS[component]
+
+    logger = logging.getLogger(f"eboekhouden.{component}")
+    log_file = os.path.abspath(os.path.join(config.logging.log_dir, settings['file']))
+    queue_handler = next((h for h in logger.handlers if isinstance(h, QueueHandler)), None)
+    if queue_handler is not None and _file_handler(queue_handler.listener).baseFilename == log_file:
+        return logger
+
+    # First use, or the log directory was changed since the handlers were attached
+    for handler in logger.handlers[:]:
+        logger.removeHandler(handler)
+        _close_handler(handler)
+
+    os.makedirs(config.logging.log_dir, exist_ok=True)
+    file_handler = RotatingFileHandler(
+        log_file,
+        maxBytes=config.logging.max_bytes,
+        backupCount=config.logging.backup_count,
+        encoding='utf-8'
+    )
+    file_handler.setFormatter(_FORMATTER)
+    console_handler = _console_handler(_FORMATTER)
+
+    listener = QueueListener(
+        queue.Queue(-1),
+        MemoryHandler(capacity=512, flushLevel=logging.ERROR, target=file_handler),
+        console_handler,
+        respect_handler_level=True
+    )
+    listener.start()
+    queue_handler = QueueHandler(listener.queue)
+    queue_handler.listener = listener
+
+    logger.addHandler(queue_handler)
+    logger.setLevel(settings['level'])
+    logger.propagate = False
+    return logger
+
+def _console_handler(formatter: logging.Formatter) -> logging.Handler:
+    """Build the handler that echoes component records to the console."""
+    handler = logging.StreamHandler()
+    handler.setFormatter(formatter)
+    return handler
+
+def flush_logs() -> None:
+    """Write out every component log record that is still queued or buffered."""
+    for listener in _listeners():
+        listener.stop()
+        for handler in listener.handlers:
+            handler.flush()
+        listener.start()
+
+def _listeners() -> Iterator[QueueListener]:
+    """Yield the running listeners of the component loggers."""
+    for component in COMPONENTS:
+        for handler in logging.getLogger(f"eboekhouden.{component}").handlers:
+            if isinstance(handler, QueueHandler):
+                yield handler.listener
+
+def _file_handler(listener: QueueListener) -> RotatingFileHandler:
+    """Return the log file handler behind a component listener."""
+    return next(h.target for h in listener.handlers if isinstance(h, MemoryHandler))
+
+def _close_handler(handler: logging.Handler) -> None:
+    """Close a component handler, draining its listener first."""
+    listener = getattr(handler, 'listener', None)
+    if listener is not None:
+        listener.stop()
+        file_handler = _file_handler(listener)
+        for target in listener.handlers:
+            target.close()
+        file_handler.close()
+    handler.close()
+
+def close_logs() -> None:
+    """Drain the component listeners and close their log files.
+    
+    Runs when the process exits; the next get_logger call attaches fresh handlers.
+    """
+    for component in COMPONENTS:
+        logger = logging.getLogger(f"eboekhouden.{component}")
+        for handler in logger.handlers[:]:
+            if isinstance(handler, QueueHandler):
+                logger.removeHandler(handler)
+                _close_handler(handler)
+
+atexit.register(close_logs)
 
 def log_dict(logger: logging.Logger, level: int, message: str, data: Dict[str, Any]) -> None:
-    """Log a dictionary with proper formatting."""
-    logger.log(level, f"{message}: {json.dumps(data, indent=2)}") 
\ No newline at end of file
+    """Log a dictionary with proper formatting.
+    
+    The dictionary is only serialized when the logger accepts the level.
+    """
+    if not logger.isEnabledFor(level):
+        return
+    logger.log(level, "%s: %s", message, orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode()) 
\ No newline at end of file
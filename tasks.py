@@ -2,6 +2,7 @@ from robocorp.tasks import task
 import os
 from dotenv import load_dotenv
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from src.eboekhouden import EBoekhoudenClient
 from datetime import datetime
 
@@ -14,6 +15,9 @@ logging.basicConfig(
 # Global reference to keep the client alive
 _client = None
 
+# Maximum number of browsers downloading year exports at the same time
+MAX_PARALLEL_DOWNLOADS = 4
+
 def get_credentials():
     """Get credentials from environment variables."""
     load_dotenv()
@@ -70,18 +74,14 @@ def fetch_hours_for_year():
         registrations = result['data']
         logging.info(f"\nRetrieved {len(registrations)} registrations for {result['year']}:")
         
-        # Batch process logs for better performance
-        log_messages = []
-        for reg in registrations:
-            log_messages.append(
+        # Format all registrations into a single record instead of one log write per row
+        if logging.getLogger().isEnabledFor(logging.INFO):
+            logging.info("\n".join(
                 f"Date: {reg['date']}, Employee: {reg['employee']}, Project: {reg['project']}, "
                 f"Activity: {reg['activity']}, Hours: {reg['hours']}, KM: {reg['kilometers']}, "
                 f"Description: {reg['description']}"
-            )
-        
-        # Log all messages at once
-        for message in log_messages:
-            logging.info(message)
+                for reg in registrations
+            ))
             
         return result
             
@@ -171,4 +171,35 @@ def download_hours_xls():
         
     finally:
         # Don't close the client to allow for inspection
-        pass 
\ No newline at end of file
+        pass
+
+def _download_year(year: int):
+    """Download and parse the hours export of one year with a client owned by this thread.
+    
+    Playwright's sync API is bound to the thread that started it, so every worker runs its own browser.
+    """
+    username, password = get_credentials()
+    with EBoekhoudenClient(username, password) as client:
+        if not client.perform_login():
+            raise Exception(f"Login failed for year {year}")
+        return client.download_hours_xls(year)
+
+@task
+def download_hours_for_years():
+    """Download hours exports for several years in parallel.
+    
+    Years are read from EBOEKHOUDEN_YEARS as a comma separated list and default to the current year.
+    """
+    load_dotenv()
+    years = [int(year) for year in os.getenv("EBOEKHOUDEN_YEARS", "").split(",") if year.strip()]
+    if not years:
+        years = [datetime.now().year]
+    
+    # The first year runs alone, so its login saves the session that the other workers restore
+    results = {years[0]: _download_year(years[0])}
+    with ThreadPoolExecutor(max_workers=MAX_PARALLEL_DOWNLOADS) as executor:
+        results.update(zip(years[1:], executor.map(_download_year, years[1:])))
+    
+    for year, (xls_path, events) in results.items():
+        logging.info(f"Downloaded {len(events)} events for {year} to {xls_path}")
+    return results
@@ -0,0 +1,13 @@
+import pytest
+from src.config import config
+from src.logging_config import close_logs
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _session_log_dir(tmp_path_factory):
+    """Write component logs below the session's temporary directory instead of the repository's logs/."""
+    original_log_dir = config.logging.log_dir
+    config.logging.log_dir = tmp_path_factory.mktemp("logs")
+    yield
+    close_logs()
+    config.logging.log_dir = original_log_dir
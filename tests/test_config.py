@@ -51,6 +51,7 @@ def test_eboekhouden_config():
     assert config.password == "test_pass"
     assert config.base_url == "https://secure20.e-boekhouden.nl"
     assert "e-boekhouden.nl" in config.login_url
+    assert config.session_ttl_hours == 8
 
 def test_directory_config_defaults():
     """Test DirectoryConfig with default values."""
@@ -58,6 +59,7 @@ def test_directory_config_defaults():
     assert config.output_dir == Path("output")
     assert config.temp_dir == Path("temp")
     assert config.screenshots_dir == Path("temp/screenshots")
+    assert config.session_path == Path(".eboekhouden_state.json")
 
 def test_directory_config_custom():
     """Test DirectoryConfig with custom values."""
@@ -90,6 +92,7 @@ def test_app_config():
     )
     
     assert isinstance(config.browser, BrowserConfig)
+    assert config.browser.block_assets is False
     assert isinstance(config.retry, RetryConfig)
     assert config.database == db_config
     assert isinstance(config.logging, LoggingConfig)
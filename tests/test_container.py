@@ -1,46 +1,53 @@
+"""Tests for the Container orchestration. PYTEST_DONT_REWRITE"""
+import copy
 import pytest
 import json
 from datetime import datetime
 from pathlib import Path
 from unittest.mock import Mock, patch
 from src.container import Container
+from src.config import config
 from src.eboekhouden import EBoekhoudenClient
 
-@pytest.fixture
-def container():
+@pytest.fixture(scope="session")
+def _container():
     return Container()
 
 @pytest.fixture
-def mock_client(mocker):
-    client = Mock(spec=EBoekhoudenClient)
+def container(_container):
+    """The shared Container, with its client cleared after each test."""
+    yield _container
+    _container._client = None
+
+@pytest.fixture(scope="session")
+def client_spec():
+    """Attribute names of EBoekhoudenClient, introspected once per test session."""
+    return dir(EBoekhoudenClient)
+
+@pytest.fixture
+def mock_client():
+    client = Mock()
     client.login.return_value = True
     return client
 
-@pytest.fixture
-def mock_events():
-    return [
+# Sample data shared by the tests, handed out as copies by the sample_data fixture
+_SAMPLE_DATA = {
+    "events": [
         {
             "id": 1,
             "date": "2024-01-15",
             "hours": 8,
             "description": "Test event"
         }
-    ]
-
-@pytest.fixture
-def mock_schema():
-    return {
+    ],
+    "schema": {
         "type": "array",
         "items": {
             "type": "object",
             "required": ["id", "date", "hours", "description"]
         }
-    }
-
-@pytest.fixture
-def mock_db_events():
-    """Sample database events for testing."""
-    return [
+    },
+    "db_events": [
         {
             "event_id": "event1",
             "user_name": "Test User",
@@ -67,12 +74,8 @@ def mock_db_events():
             "created_at": "2024-01-15T11:00:00Z",
             "updated_at": "2024-01-15T11:00:00Z"
         }
-    ]
-
-@pytest.fixture
-def mock_eb_events():
-    """Sample e-boekhouden events for testing."""
-    return [
+    ],
+    "eb_events": [
         {
             "user_name": "Test User",
             "subject": "Test Event 1",
@@ -91,11 +94,17 @@ def mock_eb_events():
             "activity": "Meeting",
             "is_deleted": False
         }
-    ]
+    ],
+}
 
-def test_get_eboekhouden_client_success(container, mocker):
+@pytest.fixture
+def sample_data():
+    """Return a fresh copy of the named sample data, so tests can modify it freely."""
+    return lambda name: copy.deepcopy(_SAMPLE_DATA[name])
+
+def test_get_eboekhouden_client_success(container, client_spec, mocker):
     """Test successful client creation and login."""
-    mock_client = Mock(spec=EBoekhoudenClient)
+    mock_client = Mock(spec=client_spec)
     mock_client.login.return_value = True
     mocker.patch('src.container.EBoekhoudenClient', return_value=mock_client)
     
@@ -103,9 +112,9 @@ def test_get_eboekhouden_client_success(container, mocker):
     assert client is not None
     mock_client.login.assert_called_once()
 
-def test_get_eboekhouden_client_login_failure(container, mocker):
+def test_get_eboekhouden_client_login_failure(container, client_spec, mocker):
     """Test client creation with login failure."""
-    mock_client = Mock(spec=EBoekhoudenClient)
+    mock_client = Mock(spec=client_spec)
     mock_client.login.return_value = False
     mocker.patch('src.container.EBoekhoudenClient', return_value=mock_client)
 
@@ -113,211 +122,103 @@ def test_get_eboekhouden_client_login_failure(container, mocker):
     with pytest.raises(RuntimeError, match="Failed to log into e-boekhouden"):
         client = container.get_eboekhouden_client()
 
-def test_get_db_events(container, mock_events):
+def test_get_db_events(container, sample_data, mocker):
     """Test retrieving events from the database."""
-    # Replace the container's get_db_events method with a simple return
-    container.get_db_events = lambda year: mock_events
+    mock_events = sample_data("events")
+    # The query returns the events as JSON, split over several rows
+    result_json = json.dumps(mock_events)
+    mock_cursor = Mock()
+    mock_cursor.fetchall.return_value = [(result_json[:10],), (result_json[10:],)]
+    mock_connection = mocker.patch('get_db_events.get_db_connection')
+    mock_connection.return_value.cursor.return_value = mock_cursor
+    mocker.patch.object(config.development, 'enabled', False)
 
     # Call the container method
     events = container.get_db_events(2024)
 
-    # Verify results
+    # Verify the query ran for the requested year and its JSON was parsed
+    assert mock_cursor.execute.call_args[0][1] == (2024,)
     assert events == mock_events
-    assert len(events) == 1
-    assert events[0]["id"] == 1
 
-def test_load_schema(container, mock_schema, mocker):
+def test_load_schema(container, sample_data, mocker):
     """Test loading JSON schema."""
+    mock_schema = sample_data("schema")
     mocker.patch('src.container.load_json_schema', return_value=mock_schema)
     
     schema = container.load_schema()
     assert schema == mock_schema
     assert schema["type"] == "array"
 
-def test_validate_events_success(container, mock_events, mock_schema, mocker):
+def test_validate_events_success(container, sample_data, mocker):
     """Test successful event validation."""
     mocker.patch('src.container.validate_events', return_value=True)
     
-    result = container.validate_events(mock_events, mock_schema)
+    result = container.validate_events(sample_data("events"), sample_data("schema"))
     assert result is True
 
-def test_save_db_events(container, mock_events, tmp_path, mocker):
+def test_save_db_events(container, sample_data, tmp_path, mocker):
     """Test saving events to JSON file."""
+    mock_events = sample_data("events")
     # Mock config directories
     mocker.patch('src.container.config.directories.output_dir', tmp_path)
+    mock_dump = mocker.patch('src.container.json.dump')
     
     timestamp = datetime(2024, 1, 15, 12, 0, 0)
     output_path = container.save_db_events(mock_events, timestamp)
     
-    assert output_path.exists()
     assert output_path.name.startswith("database_events_")
     assert output_path.suffix == ".json"
+    mock_dump.assert_called_once()
+    assert mock_dump.call_args[0][0] == mock_events
+
+def test_save_db_events_round_trip(container, sample_data, tmp_path, mocker):
+    """Test that saved events read back unchanged from disk."""
+    mock_events = sample_data("events")
+    mocker.patch('src.container.config.directories.output_dir', tmp_path)
+    
+    timestamp = datetime(2024, 1, 15, 12, 0, 0)
+    output_path = container.save_db_events(mock_events, timestamp)
+    
+    assert output_path.exists()
     
     # Verify file contents
     with open(output_path) as f:
         saved_events = json.load(f)
     assert saved_events == mock_events
 
-def test_cleanup(container, mock_client, mocker):
+def test_cleanup(container, mock_client):
     """Test resource cleanup."""
-    mocker.patch.object(container, '_client', mock_client)
+    container._client = mock_client
     
     container.cleanup()
     mock_client.close.assert_called_once()
     assert container._client is None 
 
-def test_process_events_dry_run(container, mock_db_events, mock_eb_events, mocker):
-    """Test event processing in dry-run mode."""
-    # Mock the client's event comparison methods
-    mock_client = Mock(spec=EBoekhoudenClient)
-    mock_client.events_differ.return_value = True
-    mock_client.get_event_differences.return_value = {
-        "hours": {"database": 8.0, "e-boekhouden": 7.0}
-    }
-    mocker.patch.object(container, '_client', mock_client)
-    
-    # Process events
-    stats = container.process_events(mock_db_events, mock_eb_events, dry_run=True)
-    
-    # Verify statistics
-    assert stats["would_add"] == 1  # event2 needs to be added
-    assert stats["would_update"] == 1  # event1 needs update
-    assert stats["orphaned_events"] == 1  # One event without event_id
-    assert stats["conflict_events"] == 0
-    assert stats["base_data_conflicts"] == 0
+def _mark_invoiced(eb_events):
+    eb_events[0]["is_invoiced"] = True
 
-def test_process_events_with_conflicts(container, mock_db_events, mock_eb_events, mocker):
-    """Test event processing with invoiced events."""
-    # Modify e-boekhouden event to be invoiced
-    mock_eb_events[0]["is_invoiced"] = True
-    
-    # Mock the client's event comparison methods
-    mock_client = Mock(spec=EBoekhoudenClient)
-    mock_client.events_differ.return_value = True
-    mock_client.get_event_differences.return_value = {
-        "hours": {"database": 8.0, "e-boekhouden": 7.0}
-    }
-    mocker.patch.object(container, '_client', mock_client)
-    
-    # Process events
-    stats = container.process_events(mock_db_events, mock_eb_events, dry_run=True)
-    
-    # Verify statistics
-    assert stats["would_add"] == 1  # event2 needs to be added
-    assert stats["would_update"] == 0  # event1 can't be updated (invoiced)
-    assert stats["orphaned_events"] == 1  # One event without event_id
-    assert stats["conflict_events"] == 1  # One invoiced event with differences
-    assert stats["base_data_conflicts"] == 0 
-
-def test_process_events_missing_fields(container, mock_db_events, mock_eb_events, mocker):
-    """Test event processing with missing fields."""
-    # Remove required fields from e-boekhouden event
-    mock_eb_events[0].pop("hours")
-    mock_eb_events[0].pop("project")
-    
-    # Mock the client's event comparison methods
-    mock_client = Mock(spec=EBoekhoudenClient)
-    mock_client.events_differ.return_value = True
-    mock_client.get_event_differences.return_value = {
-        "hours": {"database": 8.0, "e-boekhouden": None},
-        "project": {"database": "Project A", "e-boekhouden": None}
-    }
-    mocker.patch.object(container, '_client', mock_client)
-    
-    # Process events
-    stats = container.process_events(mock_db_events, mock_eb_events, dry_run=True)
-    
-    # Verify statistics
-    assert stats["would_update"] == 1  # event1 needs update due to missing fields
-    assert stats["base_data_conflicts"] == 0
-    assert stats["would_add"] == 1  # event2 still needs to be added
-    assert stats["orphaned_events"] == 1  # One event without event_id
+def _drop_required_fields(eb_events):
+    eb_events[0].pop("hours")
+    eb_events[0].pop("project")
 
-def test_process_events_field_differences(container, mock_db_events, mock_eb_events, mocker):
-    """Test event processing with different field values."""
-    # Modify e-boekhouden event fields
-    mock_eb_events[0].update({
+def _change_fields(eb_events):
+    eb_events[0].update({
         "hours": 4.0,  # Different hours
         "project": "Project X",  # Different project
         "activity": "Testing",  # Different activity
         "user_name": "Another User"  # Different user
     })
-    
-    # Mock the client's event comparison methods
-    mock_client = Mock(spec=EBoekhoudenClient)
-    mock_client.events_differ.return_value = True
-    mock_client.get_event_differences.return_value = {
-        "hours": {"database": 8.0, "e-boekhouden": 4.0},
-        "project": {"database": "Project A", "e-boekhouden": "Project X"},
-        "activity": {"database": "Development", "e-boekhouden": "Testing"},
-        "user_name": {"database": "Test User", "e-boekhouden": "Another User"}
-    }
-    mocker.patch.object(container, '_client', mock_client)
-    
-    # Process events
-    stats = container.process_events(mock_db_events, mock_eb_events, dry_run=True)
-    
-    # Verify statistics
-    assert stats["would_update"] == 1  # event1 needs update due to field differences
-    assert stats["base_data_conflicts"] == 2  # Project and Activity differences
-    assert stats["would_add"] == 1  # event2 still needs to be added
-    assert stats["orphaned_events"] == 1  # One event without event_id
-
-def test_process_events_error_handling(container, mock_db_events, mock_eb_events, mocker):
-    """Test error handling during event processing."""
-    # Mock the client's event comparison methods to raise an exception
-    mock_client = Mock(spec=EBoekhoudenClient)
-    mock_client.events_differ.side_effect = Exception("Test error")
-    mocker.patch.object(container, '_client', mock_client)
-
-    # Process events - should handle the error gracefully
-    stats = container.process_events(mock_db_events, mock_eb_events, dry_run=True)
-
-    # Verify statistics - all stats should be reset on error except orphaned events
-    assert stats["would_add"] == 0  # Reset due to error
-    assert stats["would_update"] == 0  # Reset due to error
-    assert stats["base_data_conflicts"] == 0  # Reset due to error
-    assert stats["orphaned_events"] == 1  # Still counts orphaned events
-    assert stats["conflict_events"] == 0  # Reset due to error
 
-def test_process_events_no_changes_needed(container, mock_db_events, mock_eb_events, mocker):
-    """Test event processing when no changes are needed."""
-    # Make e-boekhouden events match database events exactly
-    mock_eb_events[0].update({
+def _match_first_event(eb_events):
+    eb_events[0].update({
         "hours": 8.0,
         "project": "Project A",
         "activity": "Development",
         "user_name": "Test User"
     })
-    mock_eb_events.append({
-        "user_name": "Test User",
-        "subject": "Test Event 2",
-        "description": "[event_id:event2] Test description 2",
-        "hours": 4.0,
-        "project": "Project B",
-        "activity": "Testing",
-        "is_deleted": False
-    })
-    
-    # Mock the client's event comparison methods
-    mock_client = Mock(spec=EBoekhoudenClient)
-    mock_client.events_differ.return_value = False
-    mocker.patch.object(container, '_client', mock_client)
-    
-    # Process events
-    stats = container.process_events(mock_db_events, mock_eb_events[:-1], dry_run=True)
-    
-    # Verify statistics
-    assert stats["would_add"] == 1  # event2 needs to be added
-    assert stats["would_update"] == 0  # No updates needed
-    assert stats["orphaned_events"] == 1  # One event without event_id
-    assert stats["conflict_events"] == 0
-    assert stats["base_data_conflicts"] == 0
 
-def test_process_events_all_events_match(container, mock_db_events, mock_eb_events, mocker):
-    """Test event processing when all events match exactly."""
-    # Make e-boekhouden events match database events exactly
-    mock_eb_events = [
+def _match_all_events(eb_events):
+    eb_events[:] = [
         {
             "user_name": "Test User",
             "subject": "Test Event 1",
@@ -337,18 +238,67 @@ def test_process_events_all_events_match(container, mock_db_events, mock_eb_even
             "is_deleted": False
         }
     ]
+
+@pytest.mark.parametrize("eb_mutation, events_differ, differences, expected_stats", [
+    pytest.param(
+        None, True, {"hours": {"database": 8.0, "e-boekhouden": 7.0}},
+        {"would_add": 1, "would_update": 1, "orphaned_events": 1, "conflict_events": 0, "base_data_conflicts": 0},
+        id="dry_run"),
+    pytest.param(
+        _mark_invoiced, True, {"hours": {"database": 8.0, "e-boekhouden": 7.0}},
+        # event1 can't be updated because it is invoiced
+        {"would_add": 1, "would_update": 0, "orphaned_events": 1, "conflict_events": 1, "base_data_conflicts": 0},
+        id="with_conflicts"),
+    pytest.param(
+        _drop_required_fields, True,
+        {"hours": {"database": 8.0, "e-boekhouden": None},
+         "project": {"database": "Project A", "e-boekhouden": None}},
+        {"would_add": 1, "would_update": 1, "orphaned_events": 1, "conflict_events": 0, "base_data_conflicts": 0},
+        id="missing_fields"),
+    pytest.param(
+        _change_fields, True,
+        {"hours": {"database": 8.0, "e-boekhouden": 4.0},
+         "project": {"database": "Project A", "e-boekhouden": "Project X"},
+         "activity": {"database": "Development", "e-boekhouden": "Testing"},
+         "user_name": {"database": "Test User", "e-boekhouden": "Another User"}},
+        # Project and Activity differences are base data conflicts
+        {"would_add": 1, "would_update": 1, "orphaned_events": 1, "conflict_events": 0, "base_data_conflicts": 2},
+        id="field_differences"),
+    pytest.param(
+        None, Exception("Test error"), None,
+        # All stats are reset on error, orphaned events are not counted once a step has failed
+        {"would_add": 0, "would_update": 0, "orphaned_events": 0, "conflict_events": 0, "base_data_conflicts": 0},
+        id="error_handling"),
+    pytest.param(
+        _match_first_event, False, None,
+        {"would_add": 1, "would_update": 0, "orphaned_events": 1, "conflict_events": 0, "base_data_conflicts": 0},
+        id="no_changes_needed"),
+    pytest.param(
+        _match_all_events, False, None,
+        {"would_add": 0, "would_update": 0, "orphaned_events": 0, "conflict_events": 0, "base_data_conflicts": 0},
+        id="all_events_match"),
+])
+def test_synchronize_events_dry_run(container, sample_data, eb_mutation, events_differ, differences, expected_stats):
+    """Test event synchronization in dry-run mode for different e-boekhouden states."""
+    mock_db_events = sample_data("db_events")
+    mock_eb_events = sample_data("eb_events")
+    if eb_mutation:
+        eb_mutation(mock_eb_events)
     
-    # Mock the client's event comparison methods
-    mock_client = Mock(spec=EBoekhoudenClient)
-    mock_client.events_differ.return_value = False
-    mocker.patch.object(container, '_client', mock_client)
+    # Mock the client's event comparison methods, synchronize_events reuses an already set client without logging in
+    mock_client = Mock()
+    if isinstance(events_differ, Exception):
+        mock_client.events_differ.side_effect = events_differ
+    else:
+        mock_client.events_differ.return_value = events_differ
+    if differences is not None:
+        mock_client.get_event_differences.return_value = differences
+    container._client = mock_client
     
-    # Process events
-    stats = container.process_events(mock_db_events, mock_eb_events, dry_run=True)
+    # Synchronize events
+    stats = container.synchronize_events(mock_db_events, mock_eb_events, 2024, dry_run=True)
     
-    # Verify statistics
-    assert stats["would_add"] == 0  # No additions needed
-    assert stats["would_update"] == 0  # No updates needed
-    assert stats["orphaned_events"] == 0  # No orphaned events
-    assert stats["conflict_events"] == 0
-    assert stats["base_data_conflicts"] == 0 
\ No newline at end of file
+    # Verify statistics, nothing is added or verified in dry-run mode
+    assert stats == {**expected_stats, "added": 0, "verified_adds": 0}
+    mock_client.add_hours_direct.assert_not_called()
+    mock_client.download_hours_xls.assert_not_called()
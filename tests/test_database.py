@@ -1,54 +1,60 @@
+"""Tests for the database client. PYTEST_DONT_REWRITE"""
 import pytest
 from datetime import datetime
 from unittest.mock import Mock, patch, MagicMock
 import pyodbc
 from src.database import DatabaseClient
 
-@pytest.fixture
-def mock_cursor():
-    cursor = Mock()
-    return cursor
-
-@pytest.fixture
-def mock_connection(mock_cursor):
-    conn = MagicMock()
-    conn.cursor.return_value = mock_cursor
-    conn.__enter__.return_value = conn
-    conn.__exit__.return_value = None
-    return conn
+@pytest.fixture(scope="session")
+def hours_description():
+    return (
+        ('id', None, None, None, None, None, None),
+        ('date', None, None, None, None, None, None),
+        ('project', None, None, None, None, None, None),
+        ('hours', None, None, None, None, None, None),
+        ('description', None, None, None, None, None, None)
+    )
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def mock_pyodbc():
-    with patch('pyodbc.connect') as mock_connect:
-        yield mock_connect
+    patcher = patch('pyodbc.connect')
+    mock_connect = patcher.start()
+    yield mock_connect
+    patcher.stop()
+
+@pytest.fixture(autouse=True)
+def _reset_pyodbc(mock_pyodbc):
+    mock_pyodbc.reset_mock()
+    mock_pyodbc.side_effect = None
 
 @pytest.fixture
 def connection_string():
     return "DRIVER={SQL Server};SERVER=test_server;DATABASE=test_db;UID=test_user;PWD=test_pass"
 
 @pytest.fixture
-def client(mock_pyodbc, mock_connection, connection_string):
-    mock_pyodbc.return_value = mock_connection
-    return DatabaseClient(connection_string)
+def db(mock_pyodbc, connection_string, hours_description):
+    """A client on a mocked connection, together with the cursor it will use."""
+    cursor = Mock()
+    cursor.description = hours_description
+    conn = MagicMock()
+    conn.cursor.return_value = cursor
+    conn.__enter__.return_value = conn
+    conn.__exit__.return_value = None
+    mock_pyodbc.return_value = conn
+    return DatabaseClient(connection_string), cursor
 
 def test_init(connection_string):
     client = DatabaseClient(connection_string)
     assert client.connection_string == connection_string
 
-def test_get_hours_data_success(client, mock_cursor):
+def test_get_hours_data_success(db):
+    client, cursor = db
     # Setup mock data
     mock_data = [
         (1, datetime(2024, 1, 1), 'Project A', 8.0, 'Task 1'),
         (2, datetime(2024, 1, 2), 'Project B', 6.5, 'Task 2')
     ]
-    mock_cursor.fetchall.return_value = mock_data
-    mock_cursor.description = [
-        ('id', None, None, None, None, None, None),
-        ('date', None, None, None, None, None, None),
-        ('project', None, None, None, None, None, None),
-        ('hours', None, None, None, None, None, None),
-        ('description', None, None, None, None, None, None)
-    ]
+    cursor.fetchall.return_value = mock_data
 
     # Call the method
     result = client.get_hours_data()
@@ -63,16 +69,10 @@ def test_get_hours_data_success(client, mock_cursor):
         'description': 'Task 1'
     }
 
-def test_get_hours_data_empty(client, mock_cursor):
+def test_get_hours_data_empty(db):
+    client, cursor = db
     # Setup mock to return empty result
-    mock_cursor.fetchall.return_value = []
-    mock_cursor.description = [
-        ('id', None, None, None, None, None, None),
-        ('date', None, None, None, None, None, None),
-        ('project', None, None, None, None, None, None),
-        ('hours', None, None, None, None, None, None),
-        ('description', None, None, None, None, None, None)
-    ]
+    cursor.fetchall.return_value = []
 
     # Call the method
     result = client.get_hours_data()
@@ -89,42 +89,23 @@ def test_get_hours_data_connection_error(mock_pyodbc, connection_string):
     with pytest.raises(pyodbc.Error):
         client.get_hours_data()
 
-def test_get_hours_data_query_error(client, mock_cursor):
-    # Setup mock to raise error during execute
-    mock_cursor.execute.side_effect = pyodbc.Error
+@pytest.mark.parametrize("failing_call", ["execute", "fetchall"])
+def test_get_hours_data_cursor_error(db, failing_call):
+    client, cursor = db
+    # Setup mock to raise error during execute or fetchall
+    getattr(cursor, failing_call).side_effect = pyodbc.Error
 
     # Test
     with pytest.raises(pyodbc.Error):
         client.get_hours_data()
 
-def test_get_hours_data_fetch_error(client, mock_cursor):
-    # Setup mock to raise error during fetchall
-    mock_cursor.description = [
-        ('id', None, None, None, None, None, None),
-        ('date', None, None, None, None, None, None),
-        ('project', None, None, None, None, None, None),
-        ('hours', None, None, None, None, None, None),
-        ('description', None, None, None, None, None, None)
-    ]
-    mock_cursor.fetchall.side_effect = pyodbc.Error
-
-    # Test
-    with pytest.raises(pyodbc.Error):
-        client.get_hours_data()
-
-def test_get_hours_data_null_values(client, mock_cursor):
+def test_get_hours_data_null_values(db):
+    client, cursor = db
     # Setup mock data with NULL values
     mock_data = [
         (1, None, None, None, None)
     ]
-    mock_cursor.fetchall.return_value = mock_data
-    mock_cursor.description = [
-        ('id', None, None, None, None, None, None),
-        ('date', None, None, None, None, None, None),
-        ('project', None, None, None, None, None, None),
-        ('hours', None, None, None, None, None, None),
-        ('description', None, None, None, None, None, None)
-    ]
+    cursor.fetchall.return_value = mock_data
 
     # Call the method
     result = client.get_hours_data()
@@ -1,44 +1,114 @@
+"""Tests for the e-boekhouden client. PYTEST_DONT_REWRITE"""
 import pytest
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import DEFAULT, Mock, patch, MagicMock
+import importlib.util
+import sys
+from pathlib import Path
 from playwright.sync_api import Page, Frame, ElementHandle, TimeoutError
-from src.eboekhouden import EBoekhoudenClient
 import os
 import json
 from datetime import datetime
-import pandas as pd
-import pytz
 
-@pytest.fixture
-def mock_playwright():
+def _load_legacy_module():
+    """Load the flat src/eboekhouden.py client, which the src/eboekhouden package shadows on import."""
+    name = "src._legacy_eboekhouden"
+    path = Path(__file__).resolve().parent.parent / "src" / "eboekhouden.py"
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+legacy_eboekhouden = _load_legacy_module()
+EBoekhoudenClient = legacy_eboekhouden.EBoekhoudenClient
+
+def _by_selector(mocks):
+    """side_effect returning the mock whose key occurs in the selector, else the default return_value."""
+    def lookup(selector, *args, **kwargs):
+        return next((mock for key, mock in mocks.items() if key in selector), DEFAULT)
+    return lookup
+
+@pytest.fixture(scope="session")
+def _header_df():
+    """Raw XLS export content with its header row, built once per session."""
+    import pandas as pd
+    
+    return pd.DataFrame({
+        'Datum': ['Datum', '2023-01-01'],
+        'Medewerker': ['Medewerker', 'Test Employee'],
+        'Project': ['Project', 'Test Project'],
+        'Activiteit': ['Activiteit', 'Test Activity'],
+        'Omschrijving': ['Omschrijving', 'Test Description'],
+        'Aantal uren': ['Aantal uren', 8],
+        'Aantal km\'s': ['Aantal km\'s', 0]
+    })
+
+@pytest.fixture(scope="module")
+def _pw_mocks():
+    """Build the playwright -> browser -> context -> page mock chain once per module."""
+    return {
+        'playwright': MagicMock(),
+        'browser': MagicMock(),
+        'context': MagicMock(),
+        'page': MagicMock()
+    }
+
+def _wire_pw_chain(mocks):
+    """Chain launch -> new_context -> new_page onto the shared mocks."""
+    # Resetting return values also drops MagicMock's default truthiness, which the client checks
+    for m in mocks.values():
+        m.__bool__.return_value = True
+    mocks['playwright'].chromium.launch.return_value = mocks['browser']
+    mocks['browser'].new_context.return_value = mocks['context']
+    mocks['context'].new_page.return_value = mocks['page']
+
+@pytest.fixture(scope="module")
+def mock_playwright(_pw_mocks):
     """Mock the playwright context and browser."""
-    with patch('src.eboekhouden.sync_playwright') as mock_pw:
-        playwright_instance = MagicMock()
-        browser_instance = MagicMock()
-        context_instance = MagicMock()
-        page_instance = MagicMock()
-        
-        # Setup the chain of mock objects
-        mock_pw.return_value.start.return_value = playwright_instance
-        playwright_instance.chromium.launch.return_value = browser_instance
-        browser_instance.new_context.return_value = context_instance
-        context_instance.new_page.return_value = page_instance
+    with patch.object(legacy_eboekhouden, 'sync_playwright') as mock_pw:
+        for m in _pw_mocks.values():
+            m.reset_mock(return_value=True, side_effect=True)
+        mock_pw.return_value.start.return_value = _pw_mocks['playwright']
+        _wire_pw_chain(_pw_mocks)
         
-        yield {
-            'playwright': playwright_instance,
-            'browser': browser_instance,
-            'context': context_instance,
-            'page': page_instance
-        }
+        yield _pw_mocks
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def client(mock_playwright):
-    """Create a client instance with mocked playwright."""
+    """Create a client instance with mocked playwright, shared by the module."""
     client = EBoekhoudenClient()
     yield client
     client.close()
 
-def test_init(mock_playwright, client):
+@pytest.fixture(autouse=True)
+def _reset_pw_mocks(request):
+    """Clear per-test configuration and call history from the shared mocks."""
+    if 'mock_playwright' not in request.fixturenames:
+        yield
+        return
+    mock_playwright = request.getfixturevalue('mock_playwright')
+    for m in mock_playwright.values():
+        m.reset_mock(return_value=True, side_effect=True)
+    _wire_pw_chain(mock_playwright)
+    yield
+
+@pytest.fixture(scope="session")
+def _login_frame_proto():
+    """Login frame mock, built once per session."""
+    frame = MagicMock()
+    frame.url = "inloggen.asp"
+    return frame
+
+@pytest.fixture
+def login_frame(_login_frame_proto):
+    _login_frame_proto.reset_mock(return_value=True, side_effect=True)
+    return _login_frame_proto
+
+def test_init(mock_playwright):
     """Test client initialization."""
+    # Build a dedicated client, the shared one has its constructor calls reset
+    client = EBoekhoudenClient()
+    
     # Verify browser was launched with correct arguments
     mock_playwright['playwright'].chromium.launch.assert_called_once()
     launch_args = mock_playwright['playwright'].chromium.launch.call_args[1]
@@ -54,13 +124,13 @@ def test_init(mock_playwright, client):
     
     # Verify page was created
     mock_playwright['context'].new_page.assert_called_once()
+    
+    client.close()
 
-def test_login_success(client, mock_playwright):
+def test_login_success(client, mock_playwright, login_frame):
     """Test successful login."""
     # Mock frame finding
-    login_frame = MagicMock()
     mock_playwright['page'].frames = [login_frame]
-    login_frame.url = "inloggen.asp"
     
     # Mock form elements
     username_field = MagicMock()
@@ -88,46 +158,38 @@ def test_login_failure_no_frame(client, mock_playwright):
     # Verify failure
     assert result is False
 
-def test_download_hours_xls_success(client, mock_playwright, tmp_path):
+def test_download_hours_xls_success(client, mock_playwright, _header_df, tmp_path, mocker, monkeypatch):
     """Test successful XLS download."""
-    # Create a temporary Excel file
-    test_df = pd.DataFrame({
-        'Datum': ['2023-01-01'],
-        'Medewerker': ['Test Employee'],
-        'Project': ['Test Project'],
-        'Activiteit': ['Test Activity'],
-        'Omschrijving': ['Test Description'],
-        'Aantal uren': [8],
-        'Aantal km\'s': [0]
-    })
-    temp_xls = tmp_path / "test.xls"
-    test_df.to_excel(temp_xls, index=False)
+    # Write the downloaded and parsed files below tmp_path
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "output").mkdir()
     
-    # Mock year dropdown evaluation
+    # Mock year dropdown evaluation, which maps option text to value
     year_select = MagicMock()
-    year_select.evaluate.return_value = [
-        {'value': '1:2023', 'text': '2023'}
-    ]
+    year_select.evaluate.return_value = {'2023': '1: 2023'}
+    
+    # Accept the Verder button as enabled
+    mocker.patch.object(legacy_eboekhouden, 'expect')
     
     # Mock successful element finding for year radio
     year_radio = MagicMock()
     mock_playwright['page'].locator.return_value.first = year_radio
     
-    # Mock selectors
-    mock_playwright['page'].wait_for_selector.side_effect = [
-        MagicMock(),  # For mainframe
-        year_select,  # For year dropdown
-        MagicMock(),  # For table
-        MagicMock()   # For export button
-    ]
-    
-    # Mock the verder button and export button
+    # Mock the verder button and export button, other locators fall back to return_value
     verder_button = MagicMock()
     export_button = MagicMock()
-    mock_playwright['page'].locator.side_effect = [
-        verder_button,  # For verder button
-        export_button   # For export button
-    ]
+    
+    # Mock selectors, looked up by selector instead of call order
+    mock_playwright['page'].wait_for_selector.side_effect = _by_selector({
+        'mainframe': MagicMock(),
+        'input-year': year_select,
+        'table': MagicMock(),
+        'xport': export_button
+    })
+    mock_playwright['page'].locator.side_effect = _by_selector({
+        'Verder': verder_button,
+        'xport': export_button
+    })
     
     # Mock download
     mock_download = MagicMock()
@@ -148,18 +210,7 @@ def test_download_hours_xls_success(client, mock_playwright, tmp_path):
         mock_exists.return_value = True
         mock_size.return_value = 1000  # Non-zero file size
         mock_makedirs.return_value = None
-        
-        # Create test DataFrame with header row
-        header_df = pd.DataFrame({
-            'Datum': ['Datum', '2023-01-01'],
-            'Medewerker': ['Medewerker', 'Test Employee'],
-            'Project': ['Project', 'Test Project'],
-            'Activiteit': ['Activiteit', 'Test Activity'],
-            'Omschrijving': ['Omschrijving', 'Test Description'],
-            'Aantal uren': ['Aantal uren', 8],
-            'Aantal km\'s': ['Aantal km\'s', 0]
-        })
-        mock_read_excel.return_value = header_df
+        mock_read_excel.return_value = _header_df
         
         # Mock the export button click to trigger download
         def click_and_download():
@@ -206,24 +257,16 @@ def test_close(client, mock_playwright):
     mock_playwright['browser'].close.assert_called_once()
     mock_playwright['playwright'].stop.assert_called_once()
 
-def test_parse_hours_xls(client, tmp_path):
+def test_parse_hours_xls(client, mocker, _header_df, tmp_path):
     """Test XLS parsing functionality."""
-    # Create a test Excel file
-    test_data = {
-        'Datum': ['Datum', '2023-01-01'],
-        'Medewerker': ['Medewerker', 'Test Employee'],
-        'Project': ['Project', 'Test Project'],
-        'Activiteit': ['Activiteit', 'Test Activity'],
-        'Omschrijving': ['Omschrijving', 'Test Description'],
-        'Aantal uren': ['Aantal uren', 8],
-        'Aantal km\'s': ['Aantal km\'s', 0]
-    }
-    df = pd.DataFrame(test_data)
-    test_file = tmp_path / "test.xls"
-    df.to_excel(test_file, index=False)
+    # Mock the Excel read instead of round-tripping through the filesystem
+    mock_read_excel = mocker.patch.object(legacy_eboekhouden.pd, 'read_excel', return_value=_header_df)
+    xls_path = str(tmp_path / "dummy.xls")
     
     # Parse the file
-    events = client._parse_hours_xls(str(test_file))
+    events = client._parse_hours_xls(xls_path)
+    mock_read_excel.assert_called_once()
+    assert mock_read_excel.call_args[0][0] == xls_path
     
     # Verify parsed data
     assert len(events) == 1
@@ -232,4 +275,95 @@ def test_parse_hours_xls(client, tmp_path):
     assert events[0]['activity'] == 'Test Activity'
     assert events[0]['hours'] == 8.0
     assert events[0]['description'] == 'Test Description'
-    assert not events[0]['is_deleted'] 
\ No newline at end of file
+    assert not events[0]['is_deleted'] 
+
+
+def test_compare_events():
+    """Test matching database events against e-boekhouden events."""
+    from src.eboekhouden.events import EBoekhoudenEvents
+    
+    db_events = [
+        # Matched by event_id, newer in the database
+        {'event_id': 'event1', 'project': 'Project A', 'activity': 'Development', 'hours': 8.0,
+         'start_date': '2024-01-15T09:00:00Z', 'last_modified': '2024-01-16T10:00:00Z'},
+        # Matched by content within 24 hours
+        {'event_id': 'event2', 'project': 'Project B', 'activity': 'Testing', 'hours': 4.0,
+         'start_date': '2024-01-16T23:00:00Z', 'last_modified': '2024-01-16T10:00:00Z'},
+        # Not present in e-boekhouden
+        {'event_id': 'event3', 'project': 'Project C', 'activity': 'Meeting', 'hours': 1.0,
+         'start_date': '2024-01-17T09:00:00Z', 'last_modified': '2024-01-17T10:00:00Z'}
+    ]
+    eb_events = [
+        {'id': '1', 'event_id': 'event1', 'project': 'Project A', 'activity': 'Development', 'hours': 8.0,
+         'date': '2024-01-15T00:00:00Z', 'last_modified': '2024-01-15T10:00:00Z'},
+        {'id': '2', 'project': 'Project B', 'activity': 'Testing', 'hours': 4.0,
+         'date': '2024-01-17T08:00:00Z', 'last_modified': '2024-01-17T10:00:00Z'},
+        {'id': '3', 'project': 'Project D', 'activity': 'Support', 'hours': 2.0,
+         'date': '2024-01-15T00:00:00Z', 'last_modified': '2024-01-15T10:00:00Z'}
+    ]
+    
+    events_to_add, events_to_update, orphaned_events = EBoekhoudenEvents().compare_events(db_events, eb_events)
+    
+    assert events_to_add == [db_events[2]]
+    assert events_to_update == [(db_events[0], eb_events[0])]
+    assert orphaned_events == [eb_events[2]]
+
+
+@pytest.mark.parametrize("db_hours, eb_hours", [
+    (7.994, 7.996),  # Same event, but rounded into different hundredths
+    (7.995, 8.004),
+    (8.0, 8.0),
+    (8.0, 8.02),  # Too far apart to be the same event
+])
+def test_compare_events_hours_rounding_boundary(db_hours, eb_hours):
+    """Content matching in compare_events agrees with events_match around rounding boundaries."""
+    from src.eboekhouden.events import EBoekhoudenEvents
+    
+    db_event = {'event_id': 'event1', 'project': 'Project A', 'activity': 'Development', 'hours': db_hours,
+                'start_date': '2024-01-15T09:00:00Z', 'last_modified': '2024-01-15T10:00:00Z'}
+    eb_event = {'id': '1', 'project': 'Project A', 'activity': 'Development', 'hours': eb_hours,
+                'date': '2024-01-15T00:00:00Z', 'last_modified': '2024-01-15T10:00:00Z'}
+    events = EBoekhoudenEvents()
+    
+    events_to_add, events_to_update, orphaned_events = events.compare_events([db_event], [eb_event])
+    
+    if events.events_match(db_event, eb_event):
+        assert events_to_add == [] and orphaned_events == []
+    else:
+        assert events_to_add == [db_event] and orphaned_events == [eb_event]
+    assert events_to_update == []
+
+
+def test_parse_hours_xls_workbook(tmp_path):
+    """Test parsing a real export workbook, with title rows before the header and a totals row after the events."""
+    import openpyxl
+    from src.eboekhouden.events import EBoekhoudenEvents
+    
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(["Urenoverzicht 2024"])
+    sheet.append([])
+    sheet.append(["Datum", "Medewerker", "Project", "Activiteit", "Omschrijving", "Aantal uren", "Aantal km's"])
+    sheet.append([datetime(2024, 1, 15), "Test Employee", "Project A", "Development", "Work [event_id:event1]", 8, 0])
+    sheet.append([datetime(2024, 1, 16, 9, 30), "Test Employee", "Project B", "Testing", "Review", 4.5, 12])
+    sheet.append([datetime(2024, 1, 17), "Test Employee", "Project B", "Testing", "No hours", "n.v.t.", 0])
+    sheet.append([None, None, None, None, "Totaal", 12.5, 12])
+    xls_path = tmp_path / "hours.xlsx"
+    workbook.save(xls_path)
+    
+    events = EBoekhoudenEvents()
+    events.browser_logger = Mock()
+    parsed = events.parse_hours_xls(str(xls_path))
+    
+    # The list is sized from the sheet's seven rows, then trimmed to the events found
+    assert len(parsed) == 2
+    assert [(e['user_name'], e['project'], e['activity'], e['hours'], e['date']) for e in parsed] == [
+        ('Test Employee', 'Project A', 'Development', 8.0, '2024-01-15'),
+        ('Test Employee', 'Project B', 'Testing', 4.5, '2024-01-16T09:30:00'),
+    ]
+    assert parsed[0]['event_id'] == 'event1'
+    assert 'event_id' not in parsed[1]
+    # Recurring names are interned, so every event shares one string object
+    assert parsed[0]['user_name'] is parsed[1]['user_name']
+    events.browser_logger.warning.assert_called_once()
+    events.browser_logger.error.assert_not_called()
@@ -1,119 +1,97 @@
 import pytest
-from pathlib import Path
-from datetime import datetime
-from unittest.mock import Mock, patch
+from unittest.mock import Mock
 import main
 from src.container import Container
+from src.eboekhouden import EBoekhoudenClient
 
-@pytest.fixture
-def mock_container(mocker):
-    container = Mock(spec=Container)
-    container.get_events.return_value = [
+# Default return values, applied to the shared mocks before every test
+_CONTAINER_DEFAULTS = {
+    "get_db_events.return_value": [
         {
             "id": 1,
             "date": "2024-01-15",
             "hours": 8,
             "description": "Test event"
         }
-    ]
-    container.load_schema.return_value = {
-        "type": "array",
-        "items": {
-            "type": "object",
-            "required": ["id", "date", "hours", "description"]
-        }
-    }
-    container.validate_events.return_value = True
-    container.save_events.return_value = Path("output/test_events.json")
-    return container
-
-@pytest.fixture
-def mock_client(mocker):
-    client = Mock()
-    client.download_hours_xls.return_value = (
-        Path("output/test.xls"),
+    ],
+    "synchronize_events.return_value": {"would_add": 0, "added": 0},
+}
+_CLIENT_DEFAULTS = {
+    "perform_login.return_value": True,
+    "download_hours_xls.return_value": (
+        "output/test.xls",
         [{"id": 1, "date": "2024-01-15", "hours": 8}]
-    )
-    return client
+    ),
+}
 
-def test_main_success(mock_container, mock_client, mocker):
-    """Test successful execution of main program."""
-    # Mock command line arguments
+@pytest.fixture(scope="module")
+def mock_container():
+    return Mock(spec_set=Container)
+
+@pytest.fixture(scope="module")
+def mock_client():
+    return Mock(spec_set=EBoekhoudenClient)
+
+@pytest.fixture(autouse=True)
+def _patch_main(mocker, tmp_path, mock_container, mock_client):
+    """Run main with fixed command line arguments against the mocked container and client."""
     mocker.patch('sys.argv', ['main.py', '--year', '2024'])
-    
-    # Mock container creation
     mocker.patch('main.Container', return_value=mock_container)
-    mock_container.get_eboekhouden_client.return_value = mock_client
-    
+    mocker.patch('main.EBoekhoudenClient', return_value=mock_client)
+    mocker.patch('main.setup_logging', return_value=(Mock(), Mock()))
+    mocker.patch('main.cleanup_temp_files')
+    mocker.patch.object(main.config.development, 'enabled', False)
+    mocker.patch.object(main.config.directories, 'output_dir', tmp_path / "output")
+    mocker.patch.object(main.config.directories, 'temp_dir', tmp_path / "temp")
+    mocker.patch.object(main.config.directories, 'screenshots_dir', tmp_path / "temp" / "screenshots")
+    return mock_container
+
+@pytest.fixture(autouse=True)
+def _reset_mocks(mock_container, mock_client):
+    """Clear what the previous test configured and apply the default return values."""
+    mock_container.reset_mock(return_value=True, side_effect=True)
+    mock_client.reset_mock(return_value=True, side_effect=True)
+    mock_container.configure_mock(**_CONTAINER_DEFAULTS)
+    mock_client.configure_mock(**_CLIENT_DEFAULTS)
+
+def test_main_success(mock_container, mock_client, tmp_path):
+    """Test successful execution of main program."""
     # Run main program
-    result = main.main()
-    
-    # Verify success
-    assert result == 0
-    
-    # Verify container method calls
-    mock_container.load_schema.assert_called_once()
-    mock_container.get_events.assert_called_once_with(2024)
-    mock_container.validate_events.assert_called_once()
-    mock_container.save_events.assert_called_once()
-    mock_container.get_eboekhouden_client.assert_called_once()
-    mock_container.cleanup.assert_called_once()
+    main.main()
 
-def test_main_schema_load_failure(mock_container, mocker):
-    """Test main program handling schema load failure."""
-    mocker.patch('sys.argv', ['main.py', '--year', '2024'])
-    mocker.patch('main.Container', return_value=mock_container)
-    
-    # Simulate schema load failure
-    mock_container.load_schema.side_effect = Exception("Schema load failed")
-    
-    result = main.main()
-    
-    assert result == 1
-    mock_container.load_schema.assert_called_once()
-    mock_container.cleanup.assert_called_once()
+    # Verify the database events were written to the output directory
+    assert len(list((tmp_path / "output").glob("database_events_*.json"))) == 1
 
-def test_main_events_load_failure(mock_container, mocker):
-    """Test main program handling events load failure."""
-    mocker.patch('sys.argv', ['main.py', '--year', '2024'])
-    mocker.patch('main.Container', return_value=mock_container)
-    
-    # Simulate events load failure
-    mock_container.get_events.side_effect = Exception("Events load failed")
-    
-    result = main.main()
-    
-    assert result == 1
-    mock_container.load_schema.assert_called_once()
-    mock_container.get_events.assert_called_once()
-    mock_container.cleanup.assert_called_once()
+    # Verify container and client method calls
+    mock_container.get_db_events.assert_called_once_with(2024)
+    mock_client.perform_login.assert_called_once()
+    mock_client.download_hours_xls.assert_called_once_with(2024)
+    mock_container.synchronize_events.assert_called_once_with(
+        _CONTAINER_DEFAULTS["get_db_events.return_value"],
+        _CLIENT_DEFAULTS["download_hours_xls.return_value"][1],
+        2024,
+        dry_run=False,
+    )
+    mock_client.cleanup.assert_called_once()
 
-def test_main_validation_failure(mock_container, mocker):
-    """Test main program handling validation failure."""
-    mocker.patch('sys.argv', ['main.py', '--year', '2024'])
-    mocker.patch('main.Container', return_value=mock_container)
-    
-    # Simulate validation failure
-    mock_container.validate_events.return_value = False
-    
-    result = main.main()
-    
-    assert result == 1
-    mock_container.load_schema.assert_called_once()
-    mock_container.get_events.assert_called_once()
-    mock_container.validate_events.assert_called_once()
-    mock_container.cleanup.assert_called_once()
+@pytest.mark.parametrize("container_failure, client_failure, called, client_created", [
+    pytest.param({"get_db_events.side_effect": Exception("Events load failed")}, {},
+                 ["get_db_events"], False, id="events_load_failure"),
+    pytest.param({}, {"perform_login.return_value": False},
+                 ["get_db_events"], True, id="client_login_failure"),
+    pytest.param({}, {"download_hours_xls.side_effect": Exception("Download failed")},
+                 ["get_db_events"], True, id="download_failure"),
+    pytest.param({"synchronize_events.side_effect": Exception("Sync failed")}, {},
+                 ["get_db_events", "synchronize_events"], True, id="synchronize_failure"),
+])
+def test_main_failure(mock_container, mock_client, container_failure, client_failure, called, client_created):
+    """Test main program handling a failing step."""
+    mock_container.configure_mock(**container_failure)
+    mock_client.configure_mock(**client_failure)
 
-def test_main_client_login_failure(mock_container, mocker):
-    """Test main program handling e-boekhouden login failure."""
-    mocker.patch('sys.argv', ['main.py', '--year', '2024'])
-    mocker.patch('main.Container', return_value=mock_container)
-    
-    # Simulate login failure
-    mock_container.get_eboekhouden_client.return_value = None
-    
-    result = main.main()
-    
-    assert result == 1
-    mock_container.get_eboekhouden_client.assert_called_once()
-    mock_container.cleanup.assert_called_once() 
\ No newline at end of file
+    with pytest.raises(Exception):
+        main.main()
+
+    for name in called:
+        getattr(mock_container, name).assert_called_once()
+    assert mock_client.cleanup.called == client_created
@@ -1,115 +1,197 @@
 import pytest
 import logging
 import os
-import shutil
+import re
+import sys
 from pathlib import Path
-from src.logging_config import get_logger, COMPONENTS, LOG_FORMAT, DATE_FORMAT
+from logging.handlers import MemoryHandler, QueueHandler, RotatingFileHandler
+from src import logging_config
+from src.logging_config import get_logger, flush_logs, close_logs, COMPONENTS, LOG_FORMAT, DATE_FORMAT
 from src.config import config
 
+_TS_RE = re.compile(r'\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}')
+_LEVELS = {component: logging.getLevelName(settings['level']) for component, settings in COMPONENTS.items()}
+
+def _find_line(path, needle):
+    """Return the first line of path containing needle, reading no further than that."""
+    with path.open("r", encoding="utf-8") as f:
+        return next((line for line in f if needle in line), None)
+
+def _use_log_dir(log_dir):
+    """Point the component loggers at log_dir, returning the previous directory."""
+    original_log_dir = config.logging.log_dir
+    config.logging.log_dir = log_dir
+    return original_log_dir
+
+@pytest.fixture(scope="module", autouse=True)
+def _quiet_console():
+    """Keep the component console handlers silent while this module runs."""
+    build_console_handler = logging_config._console_handler
+    
+    def quiet_console_handler(formatter):
+        handler = build_console_handler(formatter)
+        handler.setLevel(logging.CRITICAL + 1)
+        return handler
+    
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(logging_config, "_console_handler", quiet_console_handler)
+        yield
+
+@pytest.fixture(scope="module")
+def temp_log_dir(tmp_path_factory, request):
+    """Create a temporary log directory shared by the module, one per xdist worker."""
+    worker_id = getattr(request.config, "workerinput", {}).get("workerid", "master")
+    log_dir = tmp_path_factory.mktemp("logs") / worker_id
+    log_dir.mkdir()
+    # Temporarily override config log directory
+    original_log_dir = _use_log_dir(log_dir)
+    yield log_dir
+    # Release the log files, so the directory can be removed on Windows too
+    close_logs()
+    # Restore original log directory, tmp_path_factory removes the directory itself
+    config.logging.log_dir = original_log_dir
+
+@pytest.fixture(scope="module")
+def browser_logger(temp_log_dir):
+    """The browser component logger, writing into the module's log directory."""
+    return get_logger("browser")
+
 @pytest.fixture
-def temp_log_dir(tmp_path):
-    """Create a temporary log directory."""
+def rotation_log_dir(tmp_path, temp_log_dir):
+    """Give a test its own log directory, for tests that rotate the log files."""
     log_dir = tmp_path / "logs"
     log_dir.mkdir()
-    # Temporarily override config log directory
-    original_log_dir = config.logging.log_dir
-    config.logging.log_dir = log_dir
+    original_log_dir = _use_log_dir(log_dir)
     yield log_dir
-    # Restore original log directory
+    flush_logs()
+    # Point the shared loggers back at the module's log directory
     config.logging.log_dir = original_log_dir
-    # Clean up
-    if log_dir.exists():
-        shutil.rmtree(log_dir)
+    for component in COMPONENTS:
+        get_logger(component)
 
 def test_get_logger_unknown_component():
     """Test get_logger with unknown component."""
     with pytest.raises(ValueError) as exc_info:
         get_logger("unknown_component")
     assert "Unknown component" in str(exc_info.value)
-    assert str(list(COMPONENTS.keys())) in str(exc_info.value)
+    assert str(list(COMPONENTS) + ["database"]) in str(exc_info.value)
+
+def test_get_logger_database():
+    """Test that the database component is the logger setup_logging configures."""
+    logger = get_logger("database")
+    assert logger is logging.getLogger("database")
+    assert not any(isinstance(h, QueueHandler) for h in logger.handlers)
 
-def test_get_logger_creates_handlers(temp_log_dir):
+def test_get_logger_creates_handlers(browser_logger):
     """Test that get_logger creates appropriate handlers."""
-    logger = get_logger("browser")
+    logger = browser_logger
     
-    # Should have two handlers: file and console
-    assert len(logger.handlers) == 2
+    # Should have one queue handler, drained into file and console handlers
+    queue_handlers = [h for h in logger.handlers if isinstance(h, QueueHandler)]
+    assert len(queue_handlers) == 1
+    queue_handler = queue_handlers[0]
     
     # Verify handlers
-    file_handler = next((h for h in logger.handlers if isinstance(h, logging.handlers.RotatingFileHandler)), None)
-    console_handler = next((h for h in logger.handlers if isinstance(h, logging.StreamHandler) and not isinstance(h, logging.handlers.RotatingFileHandler)), None)
+    listener_handlers = queue_handler.listener.handlers
+    memory_handler = next((h for h in listener_handlers if isinstance(h, MemoryHandler)), None)
+    console_handler = next((h for h in listener_handlers if type(h) is logging.StreamHandler), None)
     
-    assert file_handler is not None
+    assert memory_handler is not None
     assert console_handler is not None
+    assert memory_handler.flushLevel == logging.ERROR
     
     # Verify file handler configuration
+    file_handler = memory_handler.target
+    assert isinstance(file_handler, RotatingFileHandler)
     assert file_handler.maxBytes == config.logging.max_bytes
     assert file_handler.backupCount == config.logging.backup_count
     assert isinstance(file_handler.formatter, logging.Formatter)
     assert file_handler.formatter._fmt == LOG_FORMAT
     assert file_handler.formatter.datefmt == DATE_FORMAT
+    assert file_handler.formatter is console_handler.formatter
 
-def test_get_logger_file_creation(temp_log_dir):
+def test_get_logger_file_creation(temp_log_dir, browser_logger):
     """Test that log files are created in the correct location."""
-    logger = get_logger("browser")
-    logger.info("Test message")
+    browser_logger.info("Test message")
+    flush_logs()
     
     log_file = temp_log_dir / "browser.log"
     assert log_file.exists()
     
     # Verify log content
-    content = log_file.read_text()
-    assert "Test message" in content
-    assert "INFO" in content
-    assert "eboekhouden.browser" in content
+    line = _find_line(log_file, "Test message")
+    assert line is not None
+    assert "INFO" in line
+    assert "eboekhouden.browser" in line
 
-def test_get_logger_rotation(temp_log_dir):
+@pytest.mark.skipif(sys.platform != "linux", reason="renaming open log files during rotation is only reliable on Linux")
+def test_get_logger_rotation(rotation_log_dir, monkeypatch):
     """Test log file rotation."""
+    # A tiny threshold triggers rotation without pushing megabytes through the handler
+    monkeypatch.setattr(config.logging, "max_bytes", 256)
     logger = get_logger("browser")
-    log_file = temp_log_dir / "browser.log"
+    log_file = rotation_log_dir / "browser.log"
     
     # Write enough data to trigger rotation
-    large_msg = "x" * (config.logging.max_bytes + 1000)
-    logger.info(large_msg)
+    logger.info("x" * 300)
+    logger.info("x" * 300)
+    flush_logs()
     
     # Check that rotation occurred
     assert log_file.exists()
-    assert (temp_log_dir / "browser.log.1").exists()
+    assert (rotation_log_dir / "browser.log.1").exists()
 
-def test_get_logger_multiple_calls():
+def test_get_logger_multiple_calls(browser_logger):
     """Test that multiple calls to get_logger return the same logger instance."""
     logger1 = get_logger("browser")
-    logger2 = get_logger("browser")
-    assert logger1 is logger2
+    assert logger1 is browser_logger
     
     # Handlers should not be duplicated
-    assert len(logger1.handlers) == 2
+    assert sum(isinstance(h, QueueHandler) for h in logger1.handlers) == 1
 
-def test_get_logger_levels(temp_log_dir):
+@pytest.mark.parametrize("component,settings", list(COMPONENTS.items()), ids=list(COMPONENTS.keys()))
+def test_get_logger_levels(temp_log_dir, component, settings):
     """Test logger level configuration."""
-    # Test each component
-    for component, settings in COMPONENTS.items():
-        logger = get_logger(component)
-        assert logger.level == getattr(logging, settings['level'])
-        
-        # Verify log file path
-        log_file = temp_log_dir / settings['file']
-        logger.info(f"Test message for {component}")
-        assert log_file.exists()
+    logger = get_logger(component)
+    assert logger.level == _LEVELS[component]
+    
+    # Verify log file path, logging at the component's own level so the record is always written
+    logger.log(logger.level, "Test message")
+    flush_logs()
+    log_file = temp_log_dir / settings['file']
+    assert log_file.exists()
+    assert log_file.stat().st_size > 0
 
-def test_log_message_format(temp_log_dir):
+def test_log_message_format(browser_logger, caplog):
     """Test that log messages are properly formatted."""
-    logger = get_logger("browser")
     test_message = "Test log message"
-    logger.info(test_message)
+    with caplog.at_level(logging.INFO, logger="eboekhouden.browser"):
+        browser_logger.info(test_message)
     
-    log_file = temp_log_dir / "browser.log"
-    content = log_file.read_text()
+    record = caplog.records[-1]
     
     # Check format components
-    assert test_message in content
-    assert "INFO" in content
-    assert "eboekhouden.browser" in content
+    assert record.name == "eboekhouden.browser"
+    assert record.levelname == "INFO"
+    assert record.getMessage() == test_message
     # Check timestamp format (YYYY-MM-DD HH:MM:SS)
-    assert any(line.split(" - ")[0].strip().match(r'\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}') 
-              for line in content.splitlines()) 
\ No newline at end of file
+    formatted = logging.Formatter(LOG_FORMAT, DATE_FORMAT).format(record)
+    assert _TS_RE.match(formatted.split(" - ", 1)[0])
+
+def test_setup_logging_flushes_replaced_handlers(tmp_path, monkeypatch):
+    """Test that a repeated setup_logging writes out what the replaced handlers still buffered."""
+    monkeypatch.chdir(tmp_path)
+    root_logger = logging.getLogger()
+    root_handlers, root_level = root_logger.handlers[:], root_logger.level
+    try:
+        _, db_logger = logging_config.setup_logging()
+        db_logger.warning("Buffered before setup")
+        logging_config.setup_logging()
+        
+        assert _find_line(tmp_path / "logs" / "database.log", "Buffered before setup") is not None
+        assert len(logging_config._buffered_handlers) == 2
+    finally:
+        for name in ("app", "database", "error"):
+            logging_config._reset_handlers(logging.getLogger(name))
+        root_logger.handlers[:] = root_handlers
+        root_logger.setLevel(root_level)